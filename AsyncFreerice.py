@@ -0,0 +1,399 @@
+from Freerice import Freerice, DEFAULT_TIMEOUT, RETRY_DELAY, HEADERS, CATEGORIES, answerId
+from Parser import parseGame, parseAnswer, parseProfilePage, parsePage
+from collections import deque
+import asyncio
+import logging
+import time
+
+'''
+  asyncio client for Freerice (needs aiohttp), the async counterpart of
+  Freerice.py: games with newGame(), submitAnswer() and play(), and leaderboards.
+
+  getAllUsers() walks a leaderboard like Freerice.getAllUsers, but keeps
+  several pages in flight: while the profiles of page N are looked up,
+  page N+1 (and the ones after it, up to 'concurrency' pages ahead) are
+  already being fetched. Rows are still yielded in rank order.
+
+  At most 'concurrency' requests are sent at once, and each one waits for
+  a token from a TokenBucket first, so a walk never goes over 'rate'
+  requests per second (after an initial 'burst').
+
+  The URLs are Freerice's, so Freerice.setHosts() applies here too, and
+  requests are reported to Freerice.metrics when it is set.
+'''
+
+CONCURRENCY = 4  # requests in flight at once
+RATE        = 10 # requests per second, 0 for no limit
+BURST       = 4  # requests sent at once before the rate applies
+
+def loadAiohttp():
+  '''
+  Imports aiohttp, like Freerice.loadTor does TorPy
+  '''
+
+  try:
+    import aiohttp
+  except ImportError:
+    print('The aiohttp library could not be found.\nPlease install it to use AsyncFreerice (and --concurrency) with \'pip3 install aiohttp\' or \'python3 -m pip install aiohttp\'.')
+    raise
+
+  return aiohttp
+
+class TokenBucket:
+  def __init__(self, rate=RATE, burst=BURST):
+    '''
+    Lets 'rate' acquire()s through per second, and up to 'burst' at once
+    '''
+
+    self.rate   = rate
+    self.burst  = max(1, burst)
+    self.tokens = self.burst
+    self.last   = time.monotonic()
+    self.lock   = asyncio.Lock()
+
+  async def acquire(self):
+    if not self.rate:
+      return
+
+    async with self.lock:
+      while True:
+        now         = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last   = now
+
+        if self.tokens >= 1:
+          self.tokens -= 1
+
+          return
+
+        await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class AsyncFreerice:
+  def __init__(self, user_id=None, session=None, concurrency=CONCURRENCY, rate=RATE, burst=BURST, timeout=DEFAULT_TIMEOUT, metrics=None, proxy=None):
+    '''
+    Use it with 'async with', which opens (and then closes) an
+    aiohttp.ClientSession unless one is given as session.
+    user_id is only needed for games.
+    '''
+
+    self.session     = session
+    self.own_session = session is None
+    self.concurrency = max(1, concurrency)
+    self.timeout     = timeout
+    self.metrics     = metrics if metrics is not None else Freerice.metrics
+    self.proxy       = proxy
+
+    self.semaphore = asyncio.Semaphore(self.concurrency)
+    self.bucket    = TokenBucket(rate, burst)
+
+    self.n_requests = 0
+
+    self.user       = user_id # user ID
+    self.game       = ''      # game ID
+    self.answer_url = ''      # set by newGame()
+    self.n_games    = 0       # number of games created
+    self.init_level = 1       # level to start at
+    self.last_ret_v = None
+
+    self.default_headers = dict(HEADERS)
+    self.categories      = dict(CATEGORIES)
+
+  async def __aenter__(self):
+    if self.session is None:
+      aiohttp = loadAiohttp()
+
+      self.session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=self.concurrency),
+        timeout=aiohttp.ClientTimeout(total=self.timeout)
+      )
+
+    return self
+
+  async def __aexit__(self, *exc):
+    await self.close()
+
+  async def close(self):
+    if self.own_session and self.session is not None:
+      await self.session.close()
+
+      self.session = None
+
+  async def request(self, endpoint, method, url, **kwargs):
+    '''
+    Sends a request once there is a free slot and a token, returns its body
+    '''
+
+    if self.proxy is not None:
+      kwargs['proxy'] = self.proxy
+
+    async with self.semaphore:
+      await self.bucket.acquire()
+
+      start = time.perf_counter()
+
+      try:
+        async with self.session.request(method, url, **kwargs) as resp:
+          body = await resp.read()
+      except Exception as e:
+        if self.metrics is not None:
+          self.metrics.request(endpoint, time.perf_counter() - start, error=e)
+
+        raise
+
+      self.n_requests += 1
+
+      if self.metrics is not None:
+        self.metrics.request(endpoint, time.perf_counter() - start, len(body), resp.status)
+
+      return body
+
+  def parse(self, endpoint, parse, raw, *args):
+    if self.metrics is None:
+      return parse(raw, *args)
+
+    return self.metrics.parse(endpoint, parse, raw, *args)
+
+  async def newGame(self):
+    data = {
+      'category': self.categories['multiplication-table'],
+      'level': self.init_level,
+      'user': self.user
+    }
+
+    body = await self.request('game', Freerice.new_game_mth, Freerice.new_game_url, json=data, headers=self.default_headers)
+    ret  = self.parse('game', parseGame, body)
+
+    if not ret.error:
+      self.answer_url = ret.link
+      self.game       = ret.game
+
+      self.n_games += 1
+
+    self.last_ret_v = ret
+
+    return ret
+
+  async def submitAnswer(self, qId, A):
+    return await self.submitAnswerId(qId, 'a' + str(A))
+
+  async def submitAnswerId(self, qId, answer_id):
+    '''
+    Answers with the ID of one of the question's options (GameData.options)
+    '''
+
+    data = {
+      'answer': answer_id,
+      'question': qId,
+      'user': self.user
+    }
+
+    body = await self.request('answer', Freerice.answer_mth, self.answer_url + Freerice.answer_url2, json=data, headers=self.default_headers)
+    ret  = self.parse('answer', parseAnswer, body)
+
+    self.last_ret_v = ret
+
+    return ret
+
+  async def playRound(self):
+    '''
+    Same as Freerice.playRound: (game, answer_id, result)
+    '''
+
+    game      = await self.newGame()
+    answer_id = None if game.error else answerId(game)
+    result    = None if answer_id is None else await self.submitAnswerId(game.question_id, answer_id)
+
+    return game, answer_id, result
+
+  async def play(self, interval=0, retries=0, retry_delay=RETRY_DELAY):
+    '''
+    Async generator of (game, answer_id, result, seconds) like Freerice.play
+    '''
+
+    failures = 0
+
+    while True:
+      start = time.time()
+
+      try:
+        game, answer_id, result = await self.playRound()
+      except Exception as e:
+        failures += 1
+
+        if failures > retries:
+          raise
+
+        logging.critical('\rRequest failed: %s. Retrying in %s seconds...' % (e, retry_delay))
+        await asyncio.sleep(retry_delay)
+
+        continue
+
+      failures = 0
+
+      yield game, answer_id, result, time.time() - start
+
+      if (result is None or result.error) and not retries:
+        return
+
+      if interval:
+        await asyncio.sleep(interval)
+
+  async def getLeaderboardPage(self, page, groups=False):
+    '''
+    Fetches one leaderboard page, returns (users, total_pages)
+    '''
+
+    if groups:
+      url = Freerice.ldbd_grps_url + str(page) + Freerice.ldbd_grps_url2
+    else:
+      url = Freerice.ldbd_usrs_url + str(page) + Freerice.ldbd_usrs_url2
+
+    body = await self.request('leaderboard', Freerice.ldbd_grps_mthd if groups else Freerice.ldbd_usrs_mthd, url)
+
+    return self.parse('leaderboard', parsePage, body)
+
+  async def getProfilesPage(self, uuids, groups=False):
+    '''
+    Fetches the profiles of up to Freerice.prfl_max_uuids UUIDs in a single request,
+    returns {uuid: {'uuid', 'name', 'avatar'}} (see Parser.parseProfilePage)
+    '''
+
+    suffix = Freerice.prfl_grps_url2 if groups else Freerice.prfl_usrs_url2
+
+    if groups:
+      url = Freerice.prfl_grps_url + ','.join(uuids) + suffix
+    else:
+      url = Freerice.prfl_usrs_url + ','.join(uuids) + suffix
+
+    body = await self.request('profiles', Freerice.prfl_grps_mthd if groups else Freerice.prfl_usrs_mthd, url)
+
+    return self.parse('profiles', parseProfilePage, body, uuids, suffix)
+
+  async def getPageProfiles(self, users, groups=False, store=None):
+    '''
+    Same as Freerice.getPageProfiles: ({uuid: profile}, number of profiles fetched)
+    '''
+
+    uuids    = [user['id'] for user in users]
+    profiles = {}
+
+    if store is not None:
+      profiles = store.getProfiles(groups, uuids)
+      uuids    = [uuid for uuid in uuids if uuid not in profiles]
+
+    if uuids:
+      fetched = await self.getProfilesPage(uuids, groups=groups)
+
+      if store is not None:
+        store.putProfiles(groups, fetched)
+
+      profiles.update(fetched)
+
+    return profiles, len(uuids)
+
+  async def getPage(self, page, groups=False, get_profiles=False, store=None):
+    '''
+    Returns (users, total_pages, profiles) for one page, from store when it is fresh there
+    '''
+
+    cached = store.getPage(groups, page) if store is not None else None
+
+    if cached is None:
+      users, total_pages = await self.getLeaderboardPage(page, groups=groups)
+
+      if store is not None:
+        store.syncPage(groups, page, total_pages, users)
+    else:
+      users, total_pages, _ = cached
+
+    profiles = {}
+
+    if get_profiles and users:
+      profiles, _ = await self.getPageProfiles(users, groups=groups, store=store)
+
+    return users, total_pages, profiles
+
+  async def getAllUsers(self, groups=False, get_profiles=False, store=None, start_page=1):
+    '''
+    Async generator of (user, page, total_pages, profile) for each entry
+    of the users (or groups) leaderboard, in rank order, like Freerice.getAllUsers
+    '''
+
+    pending = deque() # (page, task), oldest first
+
+    # The first page says how many there are
+    users, total_pages, profiles = await self.getPage(start_page, groups, get_profiles, store)
+    next_page                    = start_page + 1
+
+    try:
+      page = start_page
+
+      while True:
+        # Keep up to 'concurrency' pages in flight while this one is yielded
+        while next_page <= total_pages and len(pending) < self.concurrency:
+          pending.append((next_page, asyncio.ensure_future(self.getPage(next_page, groups, get_profiles, store))))
+          next_page += 1
+
+        for user in users:
+          yield user, page, total_pages, profiles.get(user['id'], {})
+
+        if not pending:
+          break
+
+        page, task                   = pending.popleft()
+        users, total_pages, profiles = await task
+    finally:
+      for _, task in pending:
+        task.cancel()
+
+      await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+
+def iterAllUsers(groups=False, get_profiles=False, store=None, start_page=1, **kwargs):
+  '''
+  AsyncFreerice(**kwargs).getAllUsers(...) for synchronous code.
+  The event loop runs in the calling thread (so store can be used),
+  whenever the next row is asked for.
+
+  A KeyboardInterrupt (or any other exception) stops the walk: the step
+  in flight is cancelled, the session closed, and the exception re-raised.
+  '''
+
+  async def openClient():
+    return await AsyncFreerice(**kwargs).__aenter__()
+
+  loop   = asyncio.new_event_loop()
+  client = None
+  rows   = None
+  step   = None
+
+  try:
+    client = loop.run_until_complete(openClient())
+    rows   = client.getAllUsers(groups=groups, get_profiles=get_profiles, store=store, start_page=start_page)
+
+    while True:
+      step = asyncio.ensure_future(rows.__anext__(), loop=loop)
+
+      try:
+        yield loop.run_until_complete(step)
+      except StopAsyncIteration:
+        break
+  finally:
+    try:
+      # Ctrl-C can stop the loop in the middle of a step, which leaves the
+      # generator running. Cancelling the step lets it clean up first.
+      if step is not None and not step.done():
+        step.cancel()
+
+        try:
+          loop.run_until_complete(step)
+        except (asyncio.CancelledError, Exception):
+          pass
+
+      if rows is not None:
+        loop.run_until_complete(rows.aclose())
+    finally:
+      try:
+        if client is not None:
+          loop.run_until_complete(client.close())
+      finally:
+        loop.close()
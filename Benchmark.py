@@ -0,0 +1,229 @@
+import statistics
+import threading
+import tracemalloc
+import asyncio
+import json
+import time
+import sys
+
+from MockServer import make_server, load_fixture
+from Freerice import Freerice
+from AsyncFreerice import AsyncFreerice
+import Parser
+
+'''
+  Offline benchmarks for the API clients, run against a local MockServer.py.
+
+  Every benchmark reports requests (or parses) per second, p50/p99 latency
+  and the peak memory traced while it ran (measured in a second, separate
+  pass since tracing slows everything down).
+
+  Usage: python3 Benchmark.py [--pages N] [--latency ms] [--rounds N] [--json file]
+'''
+
+DEFAULT_PAGES  = 20
+DEFAULT_ROUNDS = 200
+
+def percentile(samples, p):
+  if not samples:
+    return 0
+  samples = sorted(samples)
+  return samples[min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))]
+
+class TimedSession:
+  '''
+  Wraps a session and records how long each request takes
+  '''
+  def __init__(self, session):
+    self.session = session
+    self.samples = []
+
+  def request(self, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+      return self.session.request(*args, **kwargs)
+    finally:
+      self.samples.append(time.perf_counter() - start)
+
+class TimedAsyncFreerice(AsyncFreerice):
+  '''
+  AsyncFreerice that records how long each request takes
+  '''
+  def __init__(self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
+    self.samples = []
+
+  async def request(self, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+      return await super().request(*args, **kwargs)
+    finally:
+      self.samples.append(time.perf_counter() - start)
+
+class Benchmarks:
+  def __init__(self, base, rounds=DEFAULT_ROUNDS):
+    self.base = base
+    self.rounds = rounds
+    self.results = []
+
+    Freerice.setHosts(base, base)
+
+    import requests
+    self.session = requests.Session()
+
+    first_page, _ = Freerice.getLeaderboardPage(1, session=self.session)
+    self.uuids = [user['id'] for user in first_page]
+
+  def measure(self, name, fn):
+    '''
+    Runs fn (which returns its per-call samples) once for timing and once under tracemalloc
+    '''
+    Freerice.clearCache()
+    start = time.perf_counter()
+    samples = fn()
+    elapsed = time.perf_counter() - start
+
+    Freerice.clearCache()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+      'name': name,
+      'calls': len(samples),
+      'per_sec': len(samples) / elapsed if elapsed else 0,
+      'p50_ms': percentile(samples, 50) * 1000,
+      'p99_ms': percentile(samples, 99) * 1000,
+      'mean_ms': statistics.mean(samples) * 1000 if samples else 0,
+      'peak_kib': peak / 1024
+    }
+    self.results.append(result)
+    print('{name:<34} {calls:>7} {per_sec:>10.1f} {p50_ms:>9.3f} {p99_ms:>9.3f} {peak_kib:>10.1f}'.format(**result))
+    return result
+
+  # ---------- requests client (Freerice.py) ----------
+
+  def leaderboard(self):
+    session = TimedSession(self.session)
+    for _ in Freerice.getAllUsers(get_profiles=True, session=session):
+      pass
+    return session.samples
+
+  def profiles_single(self):
+    session = TimedSession(self.session)
+    for uuid in self.uuids:
+      Freerice.getUserProfile(uuid, use_cache=False, session=session)
+    return session.samples
+
+  def profiles_batch(self):
+    session = TimedSession(self.session)
+    for _ in range(max(1, self.rounds // 50)):
+      Freerice.getUserProfiles(self.uuids, use_cache=False, session=session)
+    return session.samples
+
+  def stats(self):
+    session = TimedSession(self.session)
+    for _ in range(self.rounds):
+      Freerice.getUserStats(self.uuids[0], use_cache=False, session=session)
+    return session.samples
+
+  def game(self):
+    freerice = Freerice(self.uuids[0])
+    samples = []
+    for i in range(self.rounds):
+      start = time.perf_counter()
+      if i % 10 == 0:
+        last = freerice.newGame()
+      else:
+        last = freerice.submitAnswer(last.question_id, 56)
+      samples.append(time.perf_counter() - start)
+    return samples
+
+  # ---------- response parsing ----------
+
+  def parse(self, parse, fixture, *args):
+    raw = json.dumps(load_fixture(fixture)).encode()
+
+    def run():
+      samples = []
+      for _ in range(self.rounds * 10):
+        start = time.perf_counter()
+        parse(raw, *args)
+        samples.append(time.perf_counter() - start)
+      return samples
+    return run
+
+  # ---------- aiohttp clients ----------
+
+  def aiohttp_leaderboard(self, concurrency=1):
+    async def walk():
+      async with TimedAsyncFreerice(concurrency=concurrency, rate=0) as client:
+        async for _ in client.getAllUsers(get_profiles=True):
+          pass
+      return client.samples
+
+    return lambda: asyncio.run(walk())
+
+  def aiohttp_game(self):
+    async def play():
+      async with TimedAsyncFreerice(self.uuids[0], rate=0) as freerice:
+        for i in range(self.rounds):
+          if i % 10 == 0:
+            last = await freerice.newGame()
+          else:
+            last = await freerice.submitAnswerId(last.question_id, 'a56')
+      return freerice.samples
+
+    return asyncio.run(play())
+
+  def run(self):
+    print('{:<34} {:>7} {:>10} {:>9} {:>9} {:>10}'.format('benchmark', 'calls', 'per sec', 'p50 ms', 'p99 ms', 'peak KiB'))
+
+    self.measure('requests: getAllUsers(profiles)', self.leaderboard)
+    self.measure('requests: getUserProfile x 50', self.profiles_single)
+    self.measure('requests: getUserProfiles(50)', self.profiles_batch)
+    self.measure('requests: getUserStats', self.stats)
+    self.measure('requests: newGame/submitAnswer', self.game)
+
+    self.measure('parse: game', self.parse(Parser.parseGame, 'game_new'))
+    self.measure('parse: answer', self.parse(Parser.parseAnswer, 'game_answer'))
+    self.measure('parse: stats', self.parse(Parser.parseStats, 'stats_group', True))
+    self.measure('parse: profiles', self.parse(Parser.parseProfiles, 'profiles', list(load_fixture('profiles'))))
+    self.measure('parse: leaderboard page', self.parse(Parser.parsePage, 'users_page'))
+
+    try:
+      import aiohttp
+    except ImportError:
+      print('aiohttp is not installed, skipping the aiohttp clients.')
+    else:
+      self.measure('aiohttp: getAllUsers(profiles)', self.aiohttp_leaderboard())
+      self.measure('aiohttp: getAllUsers(profiles) x 4', self.aiohttp_leaderboard(4))
+      self.measure('aiohttp: newGame/submitAnswer', self.aiohttp_game)
+
+    return self.results
+
+def main(argv):
+  options = {'--pages': DEFAULT_PAGES, '--latency': 0, '--rounds': DEFAULT_ROUNDS, '--json': None}
+  for option, value in zip(argv[::2], argv[1::2]):
+    if option not in options:
+      sys.exit(f'Unknown option {option}')
+    options[option] = value
+
+  server = make_server(port=0, pages=int(options['--pages']), latency=float(options['--latency']) / 1000)
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+
+  try:
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    print(f'Mock server at {base}, orjson: {"yes" if Parser.orjson else "no"}\n')
+
+    results = Benchmarks(base, int(options['--rounds'])).run()
+  finally:
+    server.shutdown()
+
+  if options['--json']:
+    with open(options['--json'], 'w') as f:
+      json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+  main(sys.argv[1:])
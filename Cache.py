@@ -0,0 +1,90 @@
+from collections import OrderedDict
+import threading
+import time
+
+'''
+  Small in-process cache for the read-only Freerice endpoints.
+
+  Entries expire after 'ttl' seconds, and once 'maxsize' entries are
+  held the least recently used one is evicted. Every method takes a
+  lock, so one cache can be shared by several threads.
+
+  get() returns the cached object itself, not a copy: treat cached
+  records as read-only, or copy them before changing them.
+'''
+
+class TTLCache:
+  def __init__(self, maxsize=256, ttl=10):
+    '''
+    Bounded LRU cache whose entries expire after ttl seconds
+    '''
+
+    self.maxsize = maxsize
+    self.ttl     = ttl
+
+    self.hits   = 0
+    self.misses = 0
+
+    self.lock    = threading.Lock()
+    self.entries = OrderedDict() # key -> (expiry time, value), least recently used first
+
+  def __len__(self):
+    return len(self.entries)
+
+  def __contains__(self, key):
+    entry = self.entries.get(key)
+
+    return entry is not None and entry[0] > time.monotonic()
+
+  def get(self, key, default=None):
+    with self.lock:
+      entry = self.entries.get(key)
+
+      if entry is None:
+        self.misses += 1
+
+        return default
+
+      if entry[0] <= time.monotonic():
+        del self.entries[key]
+
+        self.misses += 1
+
+        return default
+
+      self.entries.move_to_end(key)
+
+      self.hits += 1
+
+      return entry[1]
+
+  def put(self, key, value):
+    with self.lock:
+      self.entries[key] = (time.monotonic() + self.ttl, value)
+      self.entries.move_to_end(key)
+
+      while len(self.entries) > self.maxsize:
+        self.entries.popitem(last=False)
+
+  def pop(self, key, default=None):
+    with self.lock:
+      entry = self.entries.pop(key, None)
+
+    return default if entry is None else entry[1]
+
+  def clear(self):
+    with self.lock:
+      self.entries.clear()
+
+      self.hits   = 0
+      self.misses = 0
+
+  def stats(self):
+    with self.lock:
+      return {
+        'size'   : len(self.entries),
+        'maxsize': self.maxsize,
+        'ttl'    : self.ttl,
+        'hits'   : self.hits,
+        'misses' : self.misses
+      }
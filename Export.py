@@ -0,0 +1,126 @@
+from Freerice import Freerice
+import json
+import csv
+import os
+
+'''
+  Streaming leaderboard export.
+
+  Rows are written page by page as Freerice.getAllUsers yields them,
+  so memory use doesn't grow with the leaderboard. With a concurrency
+  set, pages are fetched ahead by AsyncFreerice.iterAllUsers instead. After each page the
+  file is flushed and its progress is saved next to it ('<path>.progress'),
+  so an interrupted export resumes from the last completed page.
+
+  Format | Extension      | Row
+---------------------------------------------------------------
+  csv    | anything else  | rank,rice,uuid,name (with a header)
+  jsonl  | .jsonl, .json  | {"rank", "rice", "uuid", "name"}
+'''
+
+FIELDS = ['rank', 'rice', 'uuid', 'name']
+
+def guessFormat(path):
+  return 'jsonl' if path.lower().endswith(('.jsonl', '.json')) else 'csv'
+
+def loadProgress(path, groups, fmt):
+  '''
+  Returns (next page, byte offset) saved by a previous export of
+  the same leaderboard and format, or None if there is nothing to resume
+  '''
+
+  try:
+    with open(path + '.progress') as f:
+      progress = json.load(f)
+  except (OSError, ValueError):
+    return None
+
+  if progress.get('groups') != groups or progress.get('format') != fmt:
+    return None
+
+  if not os.path.exists(path) or os.path.getsize(path) < progress['offset']:
+    return None
+
+  return progress['page'] + 1, progress['offset']
+
+def saveProgress(path, groups, fmt, page, offset):
+  tmp = path + '.progress.tmp'
+
+  with open(tmp, 'w') as f:
+    json.dump({'groups': groups, 'format': fmt, 'page': page, 'offset': offset}, f)
+
+  os.replace(tmp, path + '.progress')
+
+def exportLeaderboard(path, groups=False, fmt=None, resume=True, store=None, session=None, concurrency=None, rate=None):
+  '''
+  Writes the users (or groups) leaderboard to path, yielding
+  (page, total_pages) after each page is safely on disk.
+  With a concurrency, up to that many requests are sent at once,
+  at most rate per second (AsyncFreerice.RATE by default).
+  '''
+
+  fmt      = fmt or guessFormat(path)
+  progress = loadProgress(path, groups, fmt) if resume else None
+
+  if progress is None:
+    start_page, offset = 1, 0
+    f = open(path, 'w', newline='', encoding='utf-8')
+  else:
+    start_page, offset = progress
+
+    # Drop anything written after the last completed page
+    with open(path, 'r+b') as b:
+      b.truncate(offset)
+
+    f = open(path, 'a', newline='', encoding='utf-8')
+
+  with f:
+    writer = csv.writer(f) if fmt == 'csv' else None
+
+    if writer is not None and progress is None:
+      writer.writerow(FIELDS)
+
+    rows        = []
+    page        = None
+    total_pages = start_page
+
+    def writePage():
+      for row in rows:
+        if writer is not None:
+          writer.writerow(row)
+        else:
+          f.write(json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False) + '\n')
+
+      f.flush()
+      os.fsync(f.fileno())
+
+      # A text file's tell() is an opaque cookie, the byte offset is its buffer's
+      saveProgress(path, groups, fmt, page, f.buffer.tell())
+
+      rows.clear()
+
+    if concurrency:
+      from AsyncFreerice import iterAllUsers, RATE
+
+      users = iterAllUsers(groups=groups, get_profiles=True, store=store, start_page=start_page, concurrency=concurrency, rate=RATE if rate is None else rate)
+    else:
+      users = Freerice.getAllUsers(groups=groups, get_profiles=True, store=store, session=session, start_page=start_page)
+
+    for user, page_, total_pages, profile in users:
+      if page is not None and page_ != page:
+        writePage()
+
+        yield page, total_pages
+
+      page = page_
+
+      rows.append([user['attributes']['rank'], user['attributes']['rice'], user['id'], profile.get('name', '')])
+
+    if page is not None:
+      writePage()
+
+      yield page, total_pages
+
+  # Finished, nothing left to resume
+  if os.path.exists(path + '.progress'):
+    os.remove(path + '.progress')
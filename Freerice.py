@@ -1,50 +1,109 @@
 import requests as r
+from requests.adapters import HTTPAdapter
 from requests.exceptions import ConnectTimeout
-try:
-  from torpy.http.requests import do_request as tor_request
-  from torpy.documents.network_status import FetchDescriptorError
-except ImportError:
-  print('The TorPy library could not be found.\nPlease install it to use Tor with \'pip3 install torpy\' or \'python3 -m pip install torpy\'.')
 import json
+import time
+import atexit
 import logging
+import os
+
+from Cache import TTLCache
+from Parser import parseGame, parseAnswer, parseStats, parseProfiles, parseProfilePage, parsePage, loads
 
 '''
   Error IDs | Description
 ------------------------------------
    1        | JSON decode error
    2        | 'rice_total' KeyError
+   3        | The API returned 'errors'
+   4        | Missing field in the response
+
+  See Parser.py.
 '''
 
 logging.basicConfig(level=logging.CRITICAL)
 
 DEFAULT_TIMEOUT = 5
+RETRY_DELAY     = 5 # seconds play() waits before retrying a request that failed
 
-class Data:
-  def __init__(self):
-    '''
-    The Data class is used for parsing responses from the Freerice API
-    '''
-    
-    self.error      = False
-    self.error_id   = 0
-    self.error_info = []
+STATS_TTL       = 10      # seconds getUserStats results are reused
+PROFILE_TTL     = 60 * 60 # seconds getUserProfile results are reused
+CACHE_SIZE      = 1024    # entries kept per cache
+POOL_SIZE       = 10      # keep-alive connections per host in the shared session
+
+# Sent with the game requests, by this client and AsyncFreerice
+HEADERS = {
+  'Content-type': 'application/json',
+  'Origin'      : 'https://freerice.com',
+  'User-Agent'  : 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_3) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/87.0.4280.88 Safari/537.36',
+  'Accept'      : 'application/vnd.api+json;version=2'
+}
+
+CATEGORIES = {
+  'multiplication-table': '66f2a9aa-bac2-5919-997d-2d17825c1837'
+}
+
+# FREERICE_METRICS=file turns the metrics on in every client and writes them to file on exit
+METRICS = os.environ.get('FREERICE_METRICS')
+
+# TorPy is slow to import, so it is only loaded by the first Tor request
+tor_request          = None
+FetchDescriptorError = None
+
+def loadTor():
+  '''
+  Imports TorPy on first use, returns (tor_request, FetchDescriptorError)
+  '''
+
+  global tor_request, FetchDescriptorError
+
+  if tor_request is None:
+    try:
+      from torpy.http.requests import do_request as tor_request
+      from torpy.documents.network_status import FetchDescriptorError
+    except ImportError:
+      print('The TorPy library could not be found.\nPlease install it to use Tor with \'pip3 install torpy\' or \'python3 -m pip install torpy\'.')
+      raise
 
-    self.game = ''
+  return tor_request, FetchDescriptorError
 
-    self.name = ''
-    self.rank = 0
-    self.avtr = ''
+def answerId(game):
+  '''
+  The ID of the option answering a multiplication question ('7 x 8'),
+  None if there is no such option
+  '''
 
-    self.members = []
+  operands = game.question_txt.split(' x ')
 
-    self.rice_total = 0
-    self.streak     = 0
+  if len(operands) != 2:
+    return None
 
-    self.question_id  = ''
-    self.question_txt = ''
+  try:
+    answer = str(int(operands[0]) * int(operands[1]))
+  except ValueError:
+    return None
+
+  return next((option['id'] for option in game.options if option['text'] == answer), None)
+
+def formatRound(game, answer_id, result, seconds):
+  '''
+  One line describing a round yielded by Freerice.play() or AsyncFreerice.play()
+  '''
+
+  if game.error:
+    return f'Error starting new game: {game.error_info}'
+  if answer_id is None:
+    return f'Failed to find the answer to: {game.question_txt}'
+  if result.error:
+    return f'Error submitting answer: {result.error_info}'
+
+  return f"Answered '{game.question_txt}'. Streak: {result.streak}, Rice Total: {result.rice_total}. Time taken: {seconds:.6f} seconds"
 
 class Freerice:
   # ============== URLS ==============
+  engine_host    = 'https://engine.freerice.com'
+  accounts_host  = 'https://accounts.freerice.com'
+
   new_game_url   = 'https://engine.freerice.com/games?lang=en'
   new_game_mth   = 'POST'
 
@@ -97,8 +156,22 @@ class Freerice:
   prfl_grps_url  = 'https://accounts.freerice.com/public/groups?uuids=' # comma-sepparated user IDs
   prfl_grps_url2 = '&_format=json'
   prfl_grps_mthd = 'GET'
+
+  prfl_max_uuids = 50 # most IDs the profile endpoints are asked for at once
   # ============ END URLS ============
 
+  # Shared keep-alive session for the read-only helpers, see getSession()
+  session   = None
+  pool_size = POOL_SIZE
+
+  # Shared by every instance and thread, keyed by (group, uuid).
+  # The cached records are handed out as they are, so treat them as read-only.
+  stats_cache   = TTLCache(maxsize=CACHE_SIZE, ttl=STATS_TTL)
+  profile_cache = TTLCache(maxsize=CACHE_SIZE, ttl=PROFILE_TTL)
+
+  # Metrics.Metrics every request and parse is reported to, see setMetrics()
+  metrics = None
+
   def __init__(self, user_id, timeout=DEFAULT_TIMEOUT):
     '''
     The main hack class to use
@@ -110,21 +183,14 @@ class Freerice:
     self.init_level = 1       # level to start at
     self.timeout    = timeout
 
-    self.default_headers = {
-      'Content-type': 'application/json',
-      'Origin'      : 'https://freerice.com',
-      'User-Agent'  : 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_3) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/87.0.4280.88 Safari/537.36',
-      'Accept'      : 'application/vnd.api+json;version=2'
-    }
+    self.default_headers = dict(HEADERS)
 
     self.tor        = False
     self.tor_onions = 3                 # number of Tor layers
 
     self.last_ret_v = None
 
-    self.categories = {
-      'multiplication-table': '66f2a9aa-bac2-5919-997d-2d17825c1837'
-    }
+    self.categories = dict(CATEGORIES)
   
   def __getitem__(self, item):
     return getattr(self, item)
@@ -136,7 +202,9 @@ class Freerice:
       'user': self.user
     }
 
-    req = r.request(
+    req = self.send(
+      'game',
+      self.getSession(),
       self.new_game_mth,
       self.new_game_url,
       json=data,
@@ -144,48 +212,28 @@ class Freerice:
       timeout=self.timeout
     )
 
-    ret = Data()
-
-    try:
-      data = req.json()
-    except json.JSONDecodeError:
-      ret.error = True
-      ret.error_id = 1
-      ret.error_info = 'JSON decode error.'
-
-      self.last_ret_v = ret
-
-      return ret
+    ret = self.parse('game', parseGame, req.content)
 
-    if 'errors' in data:
-      ret.error      = True
-      ret.error_info = data['errors']
+    if not ret.error:
+      self.answer_url = ret.link
+      self.game       = ret.game
 
-      self.last_ret_v = ret
-
-      return ret
-    
-    self.answer_url = data['data']['links']['self']
-
-    ret.game         = data['data']['id']
-    ret.question_id  = data['data']['attributes']['question_id']
-    ret.question_txt = data['data']['attributes']['question']['text']
-    try:
-      ret.rice_total = data['data']['attributes']['userattributes']['rice']
-    except KeyError:
-      ret.rice_total = data['data']['attributes']['user_rice_total']
-    
-    self.game = ret.game
-
-    self.n_games += 1
+      self.n_games += 1
 
     self.last_ret_v = ret
 
     return ret
   
   def submitAnswer(self, qId, A):
+    return self.submitAnswerId(qId, 'a' + str(A))
+
+  def submitAnswerId(self, qId, answer_id):
+    '''
+    Answers with the ID of one of the question's options (GameData.options)
+    '''
+
     data = {
-      'answer': 'a' + str(A),
+      'answer': answer_id,
       'question': qId,
       'user': self.user
     }
@@ -195,11 +243,12 @@ class Freerice:
     req = False
 
     if self.tor:
+      tor_request, _ = loadTor()
       data = json.dumps(data)
       try:
         while True:
           try:
-            req = tor_request(url, headers=self.default_headers, data=data, method=self.answer_mth, hops=self.tor_onions)
+            req = self.send('answer', None, self.answer_mth, url, headers=self.default_headers, data=data, hops=self.tor_onions, send=tor_request)
             break
           except KeyboardInterrupt:
             logging.critical("\rUser controlled C during Tor request.")
@@ -207,7 +256,9 @@ class Freerice:
       except KeyboardInterrupt:
         logging.critical('\rUser controlled C during Tor request.')
     else:
-      req = r.request(
+      req = self.send(
+        'answer',
+        self.getSession(),
         self.answer_mth,
         url,
         json=data,
@@ -215,219 +266,448 @@ class Freerice:
         timeout=self.timeout
       )
 
-    ret = Data()
+    # Tor's request returns a string (.text), not a request object
+    ret = self.parse('answer', parseAnswer, req if self.tor else req.content)
 
-    try:
-      if not self.tor:
-        data = req.json()
-      else:
-        # Tor's request returns a string (.text), not a request object
-        data = json.loads(req)
-    except:
-      ret.error = True
-      ret.error_id = 1
-      ret.error_info = 'JSON decode error.'
+    self.last_ret_v = ret
 
-      self.last_ret_v = ret
+    return ret
 
-      return ret
+  def playRound(self):
+    '''
+    Answers the question of a new game, returns (game, answer_id, result).
+    answer_id is None if the question can't be answered,
+    result is None if nothing was submitted.
+    '''
 
-    if 'errors' in data:
-      ret.error      = True
-      ret.error_info = data['errors']
+    game      = self.newGame()
+    answer_id = None if game.error else answerId(game)
+    result    = None if answer_id is None else self.submitAnswerId(game.question_id, answer_id)
 
-      self.last_ret_v = ret
+    return game, answer_id, result
 
-      return ret
-    
-    try:
-      ret.game         = data['data']['id']
-      ret.question_id  = data['data']['attributes']['question_id']
-      ret.question_txt = data['data']['attributes']['question']['text']
-    except:
-      pass#print(data)
+  def play(self, interval=0, retries=0, retry_delay=RETRY_DELAY):
+    '''
+    Plays rounds (see playRound()) every interval seconds, yields
+    (game, answer_id, result, seconds) for each one.
+
+    The first failed round ends it, unless retries is set: then failed
+    rounds are only yielded, and requests that raise are tried again after
+    retry_delay seconds, up to retries times in a row.
+    '''
+
+    failures = 0
+
+    while True:
+      start = time.time()
 
-    try:
-      ret.streak = data['data']['attributes']['streak']
       try:
-        ret.rice_total = data['data']['attributes']['userattributes']['rice']
-      except KeyError:
-        try:
-          ret.rice_total = data['data']['attributes']['user_rice_total']
-        except KeyError:
-          ret.error_id = 2
-          ret.rice_total = 0
-    except KeyError:
-      ret.error = True
+        game, answer_id, result = self.playRound()
+      except Exception as e:
+        failures += 1
 
-    self.last_ret_v = ret
+        if failures > retries:
+          raise
 
-    return ret
+        logging.critical('\rRequest failed: %s. Retrying in %s seconds...' % (e, retry_delay))
+        time.sleep(retry_delay)
+
+        continue
+
+      failures = 0
+
+      yield game, answer_id, result, time.time() - start
+
+      if (result is None or result.error) and not retries:
+        return
+
+      if interval:
+        time.sleep(interval)
   
   @classmethod
-  def getUserStats(cls, user=None, group=False):
+  def getUserStats(cls, user=None, group=False, use_cache=True, session=None):
     # if user is None:
     #   user = cls.user
 
+    if use_cache:
+      data = cls.stats_cache.get((group, user))
+
+      if cls.metrics is not None:
+        cls.metrics.cache('stats', data is not None)
+
+      if data is not None:
+        return data
+
+    data, _, _ = cls.pollUserStats(user, group=group, session=session)
+
+    return data
+
+  @classmethod
+  def pollUserStats(cls, user, group=False, etag=None, modified=None, session=None):
+    '''
+    Conditional stats request: the ETag and Last-Modified values of a previous
+    poll are sent back, so an unchanged user (or group) costs a 304 and no parsing.
+    Returns (StatsData, or None if unchanged, etag, last_modified)
+    '''
+
     URL = ''
     if group:
       URL = cls.group_url + user
     else:
       URL = cls.user_url + user
 
-    req = r.request(
+    headers = {}
+    if etag:
+      headers['If-None-Match'] = etag
+    if modified:
+      headers['If-Modified-Since'] = modified
+
+    req = cls.send(
+      'stats',
+      cls.getSession(session),
       cls.group_mth if group else cls.user_mth,
       URL,
+      headers=headers,
       timeout=DEFAULT_TIMEOUT
     )
 
-    data = Data()
-    json = {}
+    if req.status_code == 304:
+      return None, etag, modified
 
-    try:
-      json = req.json()
-    except:
-      data.error = True
+    data = cls.parse('stats', parseStats, req.content, group)
 
+    if data.error:
       cls.last_ret_v = data
 
-      return data
+      return data, etag, modified
 
-    data.rice_total = json['data']['attributes']['rice']
-    data.rank       = json['data']['attributes']['rank']
-    if group:
-      data.members = json['data']['attributes']['members']
+    cls.stats_cache.put((group, user), data)
     
-    return data
+    return data, req.headers.get('ETag', etag), req.headers.get('Last-Modified', modified)
   
   @classmethod
-  def getUserProfile(cls, user, group=False):
+  def getUserProfile(cls, user, group=False, use_cache=True, session=None):
     # if user is None:
     #   user = cls.user
 
-    URL = ''
-    if group:
-      URL = cls.prfl_grps_url + user + cls.prfl_grps_url2
-    else:
-      URL = cls.prfl_usrs_url + user + cls.prfl_usrs_url2
+    return cls.getUserProfiles([user], group=group, use_cache=use_cache, session=session)[user]
 
-    req  = r.request(
-      cls.prfl_grps_mthd if group else cls.prfl_usrs_mthd,
-      URL,
-      timeout=DEFAULT_TIMEOUT
-    )
-    json = {}
-    data = Data()
-    
+  @classmethod
+  def getUserProfiles(cls, users, group=False, use_cache=True, session=None):
     '''
-    {
-      "...user-id...":{
-        "uuid": "...user-id...",
-        "name": "...user-name...",
-        "avatar": "avatar-..."
-      }
-    }
+    Looks up the profiles of any number of user (or group) IDs,
+    prfl_max_uuids per request. Returns {uuid: ProfileData} in the order given;
+    IDs whose lookup failed get a ProfileData with error set.
+    Cached profiles are shared with every other caller, don't change them.
     '''
 
-    try:
-      json = req.json()
-    except:
-      data.error = True
+    ret   = dict.fromkeys(users)
+    uuids = []
 
-      cls.last_ret_v = data
+    for user in ret:
+      data = cls.profile_cache.get((group, user)) if use_cache else None
 
-      return data
+      if use_cache and cls.metrics is not None:
+        cls.metrics.cache('profile', data is not None)
 
-    fk = user
-    
-    try:
-      data.name = json[fk]['name']
-    except KeyError:
-      fk += cls.prfl_usrs_url2
-      data.name = json[fk]['name']
-    data.avtr = json[fk]['avatar']
+      if data is None:
+        uuids.append(user)
+      else:
+        ret[user] = data
 
-    return data
+    for i in range(0, len(uuids), cls.prfl_max_uuids):
+      chunk = uuids[i:i + cls.prfl_max_uuids]
+
+      req  = cls.requestProfiles(chunk, groups=group, session=session)
+      data = cls.parse('profiles', parseProfiles, req.content, chunk, cls.prfl_grps_url2 if group else cls.prfl_usrs_url2)
+
+      for user in chunk:
+        if data[user].error:
+          cls.last_ret_v = data[user]
+        else:
+          cls.profile_cache.put((group, user), data[user])
+
+      ret.update(data)
+
+    return ret
   
   @classmethod
-  def getAllUsers(cls, groups=False, get_profiles=False):
-    # data = {}
+  def setHosts(cls, engine=None, accounts=None):
+    '''
+    Points every URL at other hosts, e.g. a local MockServer.py:
+    Freerice.setHosts('http://127.0.0.1:8081', 'http://127.0.0.1:8081')
+    '''
+
+    for name, value in list(vars(cls).items()):
+      if not name.endswith(('_url', '_url2')) or not isinstance(value, str):
+        continue
+
+      if engine is not None and value.startswith(cls.engine_host):
+        setattr(cls, name, engine + value[len(cls.engine_host):])
+      elif accounts is not None and value.startswith(cls.accounts_host):
+        setattr(cls, name, accounts + value[len(cls.accounts_host):])
+
+    if engine is not None:
+      cls.engine_host = engine
+    if accounts is not None:
+      cls.accounts_host = accounts
+
+  @classmethod
+  def getSession(cls, session=None):
+    '''
+    Returns session if one is given, otherwise the shared keep-alive
+    session, creating it with pool_size connections per host on first use
+    '''
+
+    if session is not None:
+      return session
+
+    if cls.session is None:
+      cls.setSession(pool_size=cls.pool_size)
+
+    return cls.session
+
+  @classmethod
+  def setSession(cls, session=None, pool_size=None):
+    '''
+    Replaces the shared session used by the read-only helpers.
+    Any object with a requests-like .request() works, e.g. a fake one in tests.
+    Without one, a new pooled requests.Session is created.
+    '''
+
+    if pool_size is not None:
+      cls.pool_size = pool_size
+
+    if session is None:
+      session = r.Session()
+      adapter = HTTPAdapter(pool_connections=cls.pool_size, pool_maxsize=cls.pool_size)
+
+      session.mount('https://', adapter)
+      session.mount('http://', adapter)
+
+    old         = cls.session
+    cls.session = session
+
+    if old is not None and old is not session:
+      old.close()
+
+    return session
+
+  @classmethod
+  def setMetrics(cls, metrics=None):
+    '''
+    Starts reporting every request and parse to metrics (a new
+    Metrics.Metrics if none is given) and returns it.
+    Freerice.setMetrics(False) turns the reporting off again.
+    '''
+
+    if metrics is None:
+      from Metrics import Metrics
+
+      metrics = Metrics()
+
+    cls.metrics = metrics or None
+
+    return metrics
+
+  @classmethod
+  def send(cls, endpoint, session, method, url, send=None, **kwargs):
+    '''
+    session.request(method, url, **kwargs), timed for the metrics.
+    session can be the requests module itself; another request
+    function can be passed as send, e.g. TorPy's, which returns the body.
+    '''
+
+    send = send or session.request
+
+    if cls.metrics is None:
+      return send(method=method, url=url, **kwargs)
+
+    start = time.perf_counter()
+
+    try:
+      req = send(method=method, url=url, **kwargs)
+    except Exception as e:
+      cls.metrics.request(endpoint, time.perf_counter() - start, error=e)
+
+      raise
+
+    if isinstance(req, (str, bytes)):
+      cls.metrics.request(endpoint, time.perf_counter() - start, len(req))
+    else:
+      cls.metrics.request(endpoint, time.perf_counter() - start, len(req.content), req.status_code)
+
+    return req
+
+  @classmethod
+  def parse(cls, endpoint, parse, raw, *args):
+    '''
+    parse(raw, *args), timed for the metrics
+    '''
+
+    if cls.metrics is None:
+      return parse(raw, *args)
+
+    return cls.metrics.parse(endpoint, parse, raw, *args)
+
+  @classmethod
+  def cacheStats(cls):
+    '''
+    Returns the size and hit/miss counters of the stats and profile caches
+    '''
+
+    return {
+      'stats'  : cls.stats_cache.stats(),
+      'profile': cls.profile_cache.stats()
+    }
+
+  @classmethod
+  def clearCache(cls):
+    cls.stats_cache.clear()
+    cls.profile_cache.clear()
+
+  @classmethod
+  def getLeaderboardPage(cls, page, groups=False, session=None):
+    '''
+    Fetches one leaderboard page, returns (users, total_pages)
+    '''
+
+    if groups:
+      url = cls.ldbd_grps_url + str(page) + cls.ldbd_grps_url2
+    else:
+      url = cls.ldbd_usrs_url + str(page) + cls.ldbd_usrs_url2
+
+    req  = cls.send(
+      'leaderboard',
+      cls.getSession(session),
+      cls.ldbd_grps_mthd if groups else cls.ldbd_usrs_mthd,
+      url,
+      timeout=DEFAULT_TIMEOUT
+    )
+
+    return cls.parse('leaderboard', parsePage, req.content)
+
+  @classmethod
+  def requestProfiles(cls, uuids, groups=False, session=None):
+    '''
+    Requests the profiles of a list of UUIDs in a single request
+    '''
+
+    uuids = ','.join(uuids)
 
-    url = ''
     if groups:
-      url = cls.ldbd_grps_url + '1' + cls.ldbd_grps_url2
+      url = cls.prfl_grps_url + uuids + cls.prfl_grps_url2
     else:
-      url = cls.ldbd_usrs_url + '1' + cls.ldbd_usrs_url2
-    page = 1
+      url = cls.prfl_usrs_url + uuids + cls.prfl_usrs_url2
 
-    while True:
-      req  = r.request(
-        cls.ldbd_usrs_mthd,
-        url,
-        timeout=DEFAULT_TIMEOUT
-      )
-      json = req.json()
+    return cls.send(
+      'profiles',
+      cls.getSession(session),
+      cls.prfl_grps_mthd if groups else cls.prfl_usrs_mthd,
+      url,
+      timeout=DEFAULT_TIMEOUT
+    )
 
-      # data.update(json)
-      users       = json['data']
-      page        = json['meta']['pagination']['current_page']
-      total_pages = json['meta']['pagination']['total_pages']
+  @classmethod
+  def getProfilesPage(cls, uuids, groups=False, session=None):
+    '''
+    Fetches the profiles of a list of UUIDs in a single request,
+    returns {uuid: {'uuid', 'name', 'avatar'}} (see Parser.parseProfilePage)
+    '''
 
-      profiles      = {}
-      profiles_list = []
+    req = cls.requestProfiles(uuids, groups=groups, session=session)
 
-      if get_profiles:
-        uuids = list(
-          map(
-            lambda user: user['id'],
-            users
-          )
-        )
-        uuids = ','.join(uuids)
-        
-        url2 = ''
-        if groups:
-          url2 = cls.prfl_grps_url + uuids + cls.prfl_grps_url2
-        else:
-          url2 = cls.prfl_usrs_url + uuids + cls.prfl_usrs_url2
+    return cls.parse('profiles', parseProfilePage, req.content, uuids, cls.prfl_grps_url2 if groups else cls.prfl_usrs_url2)
+
+  @classmethod
+  def getPageProfiles(cls, users, groups=False, store=None, session=None):
+    '''
+    Returns ({uuid: profile}, number of profiles fetched) for a leaderboard page.
+    With a store, only the UUIDs it has never seen are requested,
+    since names and avatars rarely change.
+    '''
 
-        req2 = r.request(
-          cls.prfl_grps_mthd if groups else cls.prfl_usrs_mthd,
-          url2,
-          timeout=DEFAULT_TIMEOUT
-        )
+    uuids    = [user['id'] for user in users]
+    profiles = {}
 
-        profiles = req2.json()
+    if store is not None:
+      profiles = store.getProfiles(groups, uuids)
+      uuids    = [uuid for uuid in uuids if uuid not in profiles]
 
-        for user_id in profiles:
-          user_ = profiles[user_id]
+    if uuids:
+      fetched = cls.getProfilesPage(uuids, groups=groups, session=session)
 
-          data_ = Data()
+      if store is not None:
+        store.putProfiles(groups, fetched)
 
-          data_.name = user_['name']
-          data_.avtr = user_['avatar']
+      profiles.update(fetched)
 
-          profiles_list.append(data_)
+    return profiles, len(uuids)
+
+  @classmethod
+  def getAllUsers(cls, groups=False, get_profiles=False, store=None, session=None, start_page=1):
+    '''
+    Walks the users (or groups) leaderboard page by page,
+    yielding (user, page, total_pages, profile) for each entry.
+
+    If a Snapshot.SnapshotStore is passed as store, fresh pages and
+    known profiles are served from it and everything fetched is saved to it.
+    The walk can start further down the leaderboard with start_page.
+    '''
+
+    page        = start_page
+    total_pages = start_page
+
+    while page <= total_pages:
+      cached = store.getPage(groups, page) if store is not None else None
+
+      if cached is None:
+        users, total_pages = cls.getLeaderboardPage(page, groups=groups, session=session)
+
+        if store is not None:
+          store.syncPage(groups, page, total_pages, users)
+      else:
+        users, total_pages, _ = cached
+
+      profiles = {}
+
+      if get_profiles:
+        profiles, _ = cls.getPageProfiles(users, groups=groups, store=store, session=session)
 
       for user in users:
         if get_profiles:
-          yield user, page, total_pages, profiles[user['id']]
+          yield user, page, total_pages, profiles.get(user['id'], {})
         else:
           yield user, page, total_pages, {}
 
-      try:
-        #print('Old URL:', url)
+      page += 1
 
-        #url = json['links']['next']# + cls.ldbd_grps_url2
-        page += 1
-        if groups:
-          url = cls.ldbd_grps_url + str(page) + cls.ldbd_grps_url2
-        else:
-          url = cls.ldbd_usrs_url + str(page) + cls.ldbd_usrs_url2
+  @classmethod
+  def syncAllUsers(cls, store, groups=False, get_profiles=True, session=None):
+    '''
+    Refetches every leaderboard page into store, fresh or not, yielding
+    (page, total_pages, changed, profiles fetched) after each one.
+    'changed' is True when the page's users, ranks or rice differ from the snapshot.
+    Once every page is synced, stored pages past the last one are dropped.
+    '''
 
-        #print('New URL:', url)
-      except KeyError:
-        # No more data
-        break
-    
-    # return data
\ No newline at end of file
+    page        = 1
+    total_pages = 1
+
+    while page <= total_pages:
+      users, total_pages = cls.getLeaderboardPage(page, groups=groups, session=session)
+      changed            = store.syncPage(groups, page, total_pages, users)
+      n_profiles         = 0
+
+      if get_profiles:
+        _, n_profiles = cls.getPageProfiles(users, groups=groups, store=store, session=session)
+
+      yield page, total_pages, changed, n_profiles
+
+      page += 1
+
+    # The leaderboard may have shrunk since the last sync
+    store.prunePages(groups, total_pages)
+
+if METRICS:
+  atexit.register(Freerice.setMetrics().dump, METRICS)
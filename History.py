@@ -0,0 +1,217 @@
+import sqlite3
+import time
+
+'''
+  Time series store for monitored rice and rank.
+
+  Samples are appended as they come in, and rollup() folds old ones into
+  per-minute and then per-hour aggregates (every ROLLUP_EVERY samples, and
+  whenever the store is opened or closed), so a monitor left running for
+  days, or started many times, keeps a bounded amount of data. Queries
+  read whichever resolution covers the window.
+
+  Table   | Resolution | Kept for
+------------------------------------------------
+  samples | raw        | RAW_KEEP seconds
+  minutes | 1 minute   | MINUTE_KEEP seconds
+  hours   | 1 hour     | forever (8760 rows a year)
+
+  'kind' is either 'users' or 'groups'.
+'''
+
+DEFAULT_PATH = 'freerice_history.sqlite3'
+
+RAW_KEEP    = 60 * 60          # seconds of raw samples kept
+MINUTE_KEEP = 2 * 24 * 60 * 60 # seconds of per-minute aggregates kept
+
+ROLLUP_EVERY = 100 # samples appended between automatic rollups
+
+UNITS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60, 'w': 7 * 24 * 60 * 60}
+
+def parseWindow(window):
+  '''
+  Parses '90', '30m', '6h', '7d' or '2w' into seconds
+  '''
+
+  window = str(window).strip().lower()
+
+  if window[-1:] in UNITS:
+    return float(window[:-1]) * UNITS[window[-1]]
+
+  return float(window)
+
+def formatGrowth(uuid, stats):
+  '''
+  Formats a History.growth() summary for the terminal
+  '''
+
+  return '\n'.join([
+    f"History of {uuid} from {time.ctime(stats['since'])} to {time.ctime(stats['until'])} ({stats['samples']} samples)",
+    f"  Rice: {stats['rice_first']} -> {stats['rice_last']} ({stats['rice_gained']:+}, {stats['rice_per_hour']:+.1f} per hour)",
+    f"  Rank: {stats['rank_first']} -> {stats['rank_last']} (best {stats['rank_best']}, worst {stats['rank_worst']})"
+  ])
+
+class History:
+  def __init__(self, path=DEFAULT_PATH):
+    '''
+    SQLite backed history of (timestamp, rice, rank) samples
+    '''
+
+    self.path      = path
+    self.n_samples = 0
+
+    self.db = sqlite3.connect(path)
+    self.db.executescript('''
+      CREATE TABLE IF NOT EXISTS samples (
+        kind TEXT    NOT NULL,
+        uuid TEXT    NOT NULL,
+        ts   REAL    NOT NULL,
+        rice INTEGER NOT NULL,
+        rank INTEGER NOT NULL
+      );
+      CREATE INDEX IF NOT EXISTS samples_ts ON samples (kind, uuid, ts);
+    ''' + ''.join('''
+      CREATE TABLE IF NOT EXISTS %s (
+        kind       TEXT    NOT NULL,
+        uuid       TEXT    NOT NULL,
+        ts         INTEGER NOT NULL,
+        n          INTEGER NOT NULL,
+        rice_first INTEGER NOT NULL,
+        rice_last  INTEGER NOT NULL,
+        rank_first INTEGER NOT NULL,
+        rank_last  INTEGER NOT NULL,
+        rank_min   INTEGER NOT NULL,
+        rank_max   INTEGER NOT NULL,
+        PRIMARY KEY (kind, uuid, ts)
+      );
+    ''' % table for table in ('minutes', 'hours')))
+
+    # Sessions with fewer than ROLLUP_EVERY samples never roll up in append()
+    self.rollup()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
+
+  @staticmethod
+  def kind(group):
+    return 'groups' if group else 'users'
+
+  def append(self, uuid, rice, rank, group=False, ts=None):
+    with self.db:
+      self.db.execute(
+        'INSERT INTO samples VALUES (?, ?, ?, ?, ?)',
+        (self.kind(group), uuid, time.time() if ts is None else ts, rice, rank)
+      )
+
+    self.n_samples += 1
+
+    if self.n_samples % ROLLUP_EVERY == 0:
+      self.rollup()
+
+  def rollup(self, now=None):
+    '''
+    Folds raw samples older than RAW_KEEP into minutes,
+    and minutes older than MINUTE_KEEP into hours
+    '''
+
+    now = time.time() if now is None else now
+
+    with self.db:
+      self.fold(
+        'SELECT kind, uuid, ts, 1, rice, rice, rank, rank, rank, rank FROM samples WHERE ts < ? ORDER BY ts',
+        'DELETE FROM samples WHERE ts < ?',
+        'minutes', 60, now - RAW_KEEP
+      )
+      self.fold(
+        'SELECT kind, uuid, ts, n, rice_first, rice_last, rank_first, rank_last, rank_min, rank_max FROM minutes WHERE ts < ? ORDER BY ts',
+        'DELETE FROM minutes WHERE ts < ?',
+        'hours', 60 * 60, now - MINUTE_KEEP
+      )
+
+  def fold(self, select, delete, table, bucket, cutoff):
+    # Only whole buckets are folded, so each one is written once
+    cutoff = cutoff // bucket * bucket
+    rows   = {}
+
+    for kind, uuid, ts, n, rice_first, rice_last, rank_first, rank_last, rank_min, rank_max in self.db.execute(select, (cutoff,)):
+      key = (kind, uuid, int(ts // bucket * bucket))
+      row = rows.get(key)
+
+      if row is None:
+        rows[key] = [n, rice_first, rice_last, rank_first, rank_last, rank_min, rank_max]
+      else:
+        row[0] += n
+        row[2]  = rice_last
+        row[4]  = rank_last
+        row[5]  = min(row[5], rank_min)
+        row[6]  = max(row[6], rank_max)
+
+    self.db.executemany('''
+      INSERT INTO %s VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+      ON CONFLICT (kind, uuid, ts) DO UPDATE SET
+        n         = n + excluded.n,
+        rice_last = excluded.rice_last,
+        rank_last = excluded.rank_last,
+        rank_min  = min(rank_min, excluded.rank_min),
+        rank_max  = max(rank_max, excluded.rank_max)
+    ''' % table, (key + tuple(row) for key, row in rows.items()))
+    self.db.execute(delete, (cutoff,))
+
+  def series(self, uuid, group=False, since=0, until=None):
+    '''
+    Returns [(ts, n, rice_first, rice_last, rank_first, rank_last, rank_min, rank_max)]
+    across every resolution, oldest first
+    '''
+
+    until = time.time() if until is None else until
+    args  = (self.kind(group), uuid, since, until)
+
+    return self.db.execute('''
+      SELECT ts, n, rice_first, rice_last, rank_first, rank_last, rank_min, rank_max FROM hours
+        WHERE kind = ? AND uuid = ? AND ts >= ? AND ts <= ?
+      UNION ALL
+      SELECT ts, n, rice_first, rice_last, rank_first, rank_last, rank_min, rank_max FROM minutes
+        WHERE kind = ? AND uuid = ? AND ts >= ? AND ts <= ?
+      UNION ALL
+      SELECT ts, 1, rice, rice, rank, rank, rank, rank FROM samples
+        WHERE kind = ? AND uuid = ? AND ts >= ? AND ts <= ?
+      ORDER BY ts
+    ''', args * 3).fetchall()
+
+  def growth(self, uuid, group=False, window=24 * 60 * 60, until=None):
+    '''
+    Summarizes the last window seconds: samples, rice gained and per hour,
+    first and last rank, best (lowest) and worst rank. None without samples.
+    '''
+
+    until  = time.time() if until is None else until
+    series = self.series(uuid, group, until - window, until)
+
+    if not series:
+      return None
+
+    first, last = series[0], series[-1]
+    hours       = max(last[0] - first[0], 1) / (60 * 60)
+
+    return {
+      'samples'      : sum(row[1] for row in series),
+      'since'        : first[0],
+      'until'        : last[0],
+      'rice_first'   : first[2],
+      'rice_last'    : last[3],
+      'rice_gained'  : last[3] - first[2],
+      'rice_per_hour': (last[3] - first[2]) / hours,
+      'rank_first'   : first[4],
+      'rank_last'    : last[5],
+      'rank_best'    : min(row[6] for row in series),
+      'rank_worst'   : max(row[7] for row in series)
+    }
+
+  def close(self):
+    try:
+      self.rollup()
+    finally:
+      self.db.close()
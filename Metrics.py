@@ -0,0 +1,262 @@
+from Parser import JSON_ERROR, RICE_ERROR, API_ERROR, MISSING_ERROR
+import threading
+import time
+import json
+
+'''
+  Request level instrumentation for the Freerice clients.
+
+  A client with a Metrics object set (Freerice.setMetrics()) reports
+  every request and every parse to it, per endpoint:
+
+  Metric                              | Labels
+------------------------------------------------------------
+  freerice_request_seconds            | endpoint (histogram)
+  freerice_parse_seconds              | endpoint (histogram)
+  freerice_response_bytes_total       | endpoint
+  freerice_responses_total            | endpoint, status
+  freerice_errors_total               | endpoint, category
+  freerice_cache_total                | cache, result
+
+  Error categories are the parser's error IDs (json, rice, api, missing),
+  'http' for 4xx and 5xx responses, 'timeout' and 'connection' for failed
+  requests, or the name of any other exception.
+
+  dump() writes them as JSON (.json files) or Prometheus text (anything else).
+'''
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10) # seconds
+PARSE_BUCKETS   = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05) # seconds
+
+ERROR_NAMES = {
+  JSON_ERROR   : 'json',
+  RICE_ERROR   : 'rice',
+  API_ERROR    : 'api',
+  MISSING_ERROR: 'missing'
+}
+
+def errorCategory(error):
+  '''
+  Groups a request exception (requests, aiohttp or TorPy) into a category
+  '''
+
+  name = type(error).__name__
+
+  if isinstance(error, TimeoutError) or 'Timeout' in name:
+    return 'timeout'
+  if isinstance(error, ConnectionError) or 'Connect' in name:
+    return 'connection'
+
+  return name
+
+def errorId(ret):
+  '''
+  The error ID of a parsed record, or of the first failed one in a {uuid: record} dict
+  '''
+
+  if isinstance(ret, dict):
+    return next((data.error_id for data in ret.values() if getattr(data, 'error_id', 0)), 0)
+
+  return getattr(ret, 'error_id', 0)
+
+class Histogram:
+  def __init__(self, buckets):
+    self.buckets = buckets
+    self.counts  = [0] * (len(buckets) + 1) # the last one is +Inf
+    self.count   = 0
+    self.sum     = 0
+
+  def observe(self, value):
+    for i, bound in enumerate(self.buckets):
+      if value <= bound:
+        break
+    else:
+      i = len(self.buckets)
+
+    self.counts[i] += 1
+    self.count     += 1
+    self.sum       += value
+
+  def cumulative(self):
+    '''
+    Returns [(upper bound, observations <= bound)], ending with '+Inf'
+    '''
+
+    ret   = []
+    total = 0
+
+    for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+      total += count
+      ret.append((bound, total))
+
+    return ret
+
+class Metrics:
+  def __init__(self, latency_buckets=LATENCY_BUCKETS, parse_buckets=PARSE_BUCKETS):
+    '''
+    Collects request and parse metrics, safe to share between threads
+    '''
+
+    self.latency_buckets = latency_buckets
+    self.parse_buckets   = parse_buckets
+
+    self.lock = threading.Lock()
+    self.reset()
+
+  def reset(self):
+    with self.lock:
+      self.latency = {} # endpoint -> Histogram
+      self.parsing = {} # endpoint -> Histogram
+      self.bytes   = {} # endpoint -> bytes received
+      self.status  = {} # (endpoint, status) -> responses
+      self.errors  = {} # (endpoint, category) -> errors
+      self.caches  = {} # (cache, 'hit' or 'miss') -> lookups
+
+  @staticmethod
+  def count(counter, key, n=1):
+    counter[key] = counter.get(key, 0) + n
+
+  def request(self, endpoint, seconds, nbytes=0, status=None, error=None):
+    '''
+    Records one request: how long it took, and either its response
+    (size and status) or the exception it raised
+    '''
+
+    with self.lock:
+      histogram = self.latency.get(endpoint)
+
+      if histogram is None:
+        histogram = self.latency[endpoint] = Histogram(self.latency_buckets)
+
+      histogram.observe(seconds)
+
+      if error is not None:
+        self.count(self.errors, (endpoint, errorCategory(error)))
+
+        return
+
+      self.count(self.bytes, endpoint, nbytes)
+
+      if status is not None:
+        self.count(self.status, (endpoint, status))
+
+        if status >= 400:
+          self.count(self.errors, (endpoint, 'http'))
+
+  def parse(self, endpoint, parse, raw, *args):
+    '''
+    Calls parse(raw, *args), recording how long it took and the error ID
+    of what it returned. Parsers that raise count as JSON errors.
+    '''
+
+    start = time.perf_counter()
+    error = 0
+
+    try:
+      ret   = parse(raw, *args)
+      error = errorId(ret)
+    except ValueError:
+      error = JSON_ERROR
+
+      raise
+    finally:
+      seconds = time.perf_counter() - start
+
+      with self.lock:
+        histogram = self.parsing.get(endpoint)
+
+        if histogram is None:
+          histogram = self.parsing[endpoint] = Histogram(self.parse_buckets)
+
+        histogram.observe(seconds)
+
+        if error:
+          self.count(self.errors, (endpoint, ERROR_NAMES.get(error, str(error))))
+
+    return ret
+
+  def cache(self, name, hit):
+    with self.lock:
+      self.count(self.caches, (name, 'hit' if hit else 'miss'))
+
+  def error(self, endpoint, category):
+    with self.lock:
+      self.count(self.errors, (endpoint, category))
+
+  def snapshot(self):
+    '''
+    Returns every metric as a JSON serializable dict
+    '''
+
+    with self.lock:
+      endpoints = {}
+
+      for endpoint in sorted(set(self.latency) | set(self.parsing) | {endpoint for endpoint, _ in self.errors}):
+        latency = self.latency.get(endpoint)
+        parsing = self.parsing.get(endpoint)
+
+        endpoints[endpoint] = {
+          'requests'     : latency.count if latency else 0,
+          'seconds'      : latency.sum if latency else 0,
+          'buckets'      : {str(bound): n for bound, n in latency.cumulative()} if latency else {},
+          'bytes'        : self.bytes.get(endpoint, 0),
+          'parses'       : parsing.count if parsing else 0,
+          'parse_seconds': parsing.sum if parsing else 0,
+          'parse_buckets': {str(bound): n for bound, n in parsing.cumulative()} if parsing else {},
+          'status'       : {str(status): n for (endpoint_, status), n in sorted(self.status.items()) if endpoint_ == endpoint},
+          'errors'       : {category: n for (endpoint_, category), n in sorted(self.errors.items()) if endpoint_ == endpoint}
+        }
+
+      caches = {}
+
+      for (name, result), n in sorted(self.caches.items()):
+        caches.setdefault(name, {'hit': 0, 'miss': 0})[result] = n
+
+      return {'endpoints': endpoints, 'cache': caches}
+
+  def json(self):
+    return json.dumps(self.snapshot(), indent=2)
+
+  def prometheus(self):
+    '''
+    Returns every metric in the Prometheus text exposition format
+    '''
+
+    lines = []
+
+    def histogram(name, help_, histograms):
+      lines.append(f'# HELP {name} {help_}')
+      lines.append(f'# TYPE {name} histogram')
+
+      for endpoint, histogram in sorted(histograms.items()):
+        for bound, n in histogram.cumulative():
+          lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="{bound}"}} {n}')
+
+        lines.append(f'{name}_sum{{endpoint="{endpoint}"}} {histogram.sum}')
+        lines.append(f'{name}_count{{endpoint="{endpoint}"}} {histogram.count}')
+
+    def counter(name, help_, labels, counts):
+      lines.append(f'# HELP {name} {help_}')
+      lines.append(f'# TYPE {name} counter')
+
+      for key, n in sorted(counts.items(), key=lambda item: str(item[0])):
+        key = key if isinstance(key, tuple) else (key,)
+        lines.append('%s{%s} %s' % (name, ','.join(f'{label}="{value}"' for label, value in zip(labels, key)), n))
+
+    with self.lock:
+      histogram('freerice_request_seconds', 'Request latency by endpoint.', self.latency)
+      histogram('freerice_parse_seconds', 'Response parse time by endpoint.', self.parsing)
+      counter('freerice_response_bytes_total', 'Response bytes received by endpoint.', ('endpoint',), self.bytes)
+      counter('freerice_responses_total', 'Responses by endpoint and HTTP status.', ('endpoint', 'status'), self.status)
+      counter('freerice_errors_total', 'Errors by endpoint and category.', ('endpoint', 'category'), self.errors)
+      counter('freerice_cache_total', 'Cache lookups by cache and result.', ('cache', 'result'), self.caches)
+
+    return '\n'.join(lines) + '\n'
+
+  def dump(self, path):
+    '''
+    Writes the metrics to path, as JSON if it ends in .json, otherwise as Prometheus text
+    '''
+
+    with open(path, 'w') as f:
+      f.write(self.json() if path.lower().endswith('.json') else self.prometheus())
@@ -0,0 +1,192 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import urllib.parse
+import hashlib
+import json
+import time
+import sys
+import os
+
+'''
+  Local stand-in for engine.freerice.com and accounts.freerice.com.
+
+  It replays the JSON:API responses in fixtures/ so the clients can be run
+  and benchmarked offline. The fixture pages only hold a few entries, they
+  are repeated (with new IDs and ranks) to fill PAGE_SIZE entries per page.
+  Point a client at it with Freerice.setHosts(url, url).
+
+    Method | Path                           | Fixture
+    -------+--------------------------------+------------------------------
+    GET    | /users?current=N, /groups?...  | users_page.json, groups_page.json
+    GET    | /public/users?uuids=a,b,...    | profiles.json
+    GET    | /users/<id>, /groups/<id>      | stats_user.json, stats_group.json
+    POST   | /games                         | game_new.json
+    PATCH  | /games/<id>/answer             | game_answer.json
+
+  GET responses carry an ETag and honour If-None-Match with a 304.
+'''
+
+FIXTURES      = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+PAGE_SIZE     = 50
+DEFAULT_PAGES = 20
+DEFAULT_PORT  = 8081
+
+def load_fixture(name):
+  with open(os.path.join(FIXTURES, name + '.json')) as f:
+    return json.load(f)
+
+class Fixtures:
+  def __init__(self, pages=DEFAULT_PAGES):
+    self.pages = pages
+    self.fixtures = {name: load_fixture(name) for name in [
+      'users_page', 'groups_page', 'profiles', 'stats_user', 'stats_group', 'game_new', 'game_answer'
+    ]}
+    self.profiles = list(self.fixtures['profiles'].values())
+
+  @staticmethod
+  def entry_id(kind, page, i):
+    # Deterministic, UUID shaped and unique per leaderboard entry
+    digest = hashlib.md5(f'{kind}/{page}/{i}'.encode()).hexdigest()
+    return f'{digest[:8]}-{digest[8:12]}-4{digest[13:16]}-8{digest[17:20]}-{digest[20:32]}'
+
+  def page(self, kind, page):
+    fixture = self.fixtures[kind + '_page']
+    templates = fixture['data']
+    data = []
+
+    if 1 <= page <= self.pages:
+      for i in range(PAGE_SIZE):
+        rank = (page - 1) * PAGE_SIZE + i + 1
+        entry = dict(templates[i % len(templates)])
+        entry['id'] = self.entry_id(kind, page, i)
+        entry.pop('links', None)
+        entry['attributes'] = dict(entry['attributes'], rank=rank, rice=10 ** 8 // rank)
+        data.append(entry)
+
+    pagination = dict(fixture['meta']['pagination'])
+    pagination.update(
+      current_page=page, total_pages=self.pages, count=len(data),
+      per_page=PAGE_SIZE, total=self.pages * PAGE_SIZE
+    )
+
+    return {'data': data, 'links': {}, 'meta': {'pagination': pagination}}
+
+  def profile_list(self, uuids):
+    ret = {}
+
+    for uuid in uuids:
+      template = self.profiles[int(hashlib.md5(uuid.encode()).hexdigest(), 16) % len(self.profiles)]
+      ret[uuid] = dict(template, uuid=uuid, name=f'{template["name"]} {uuid[:4]}')
+
+    return ret
+
+  def stats(self, kind, uuid):
+    stats = json.loads(json.dumps(self.fixtures['stats_' + kind[:-1]]))
+    stats['data']['id'] = uuid
+    return stats
+
+  def game(self, base, answer=False, game_id=None):
+    game = json.loads(json.dumps(self.fixtures['game_answer' if answer else 'game_new']))
+    game_id = game_id or game['data']['id']
+    game['data']['id'] = game_id
+    game['data']['links']['self'] = f'{base}/games/{game_id}'
+    return game
+
+class MockHandler(BaseHTTPRequestHandler):
+  protocol_version = 'HTTP/1.1'  # keep-alive, like the real servers
+  fixtures = None
+  latency = 0
+
+  # Headers and body are written separately; with Nagle on, every keep-alive
+  # response would wait for the client's delayed ACK (~40 ms)
+  disable_nagle_algorithm = True
+
+  def log_message(self, format, *args):
+    pass
+
+  def send_json(self, data, status=200):
+    body = json.dumps(data).encode()
+    etag = '"%s"' % hashlib.md5(body).hexdigest()
+
+    if self.latency:
+      time.sleep(self.latency)
+
+    # Conditional GETs get a bodyless 304 while the document is unchanged
+    if status == 200 and self.command == 'GET' and self.headers.get('If-None-Match') == etag:
+      self.send_response(304)
+      self.send_header('ETag', etag)
+      self.send_header('Content-Length', '0')
+      self.end_headers()
+      return
+
+    self.send_response(status)
+    self.send_header('Content-Type', 'application/vnd.api+json')
+    self.send_header('Content-Length', str(len(body)))
+    if self.command == 'GET':
+      self.send_header('ETag', etag)
+    self.end_headers()
+    self.wfile.write(body)
+
+  def read_body(self):
+    length = int(self.headers.get('Content-Length') or 0)
+    return self.rfile.read(length)
+
+  def route(self, method):
+    url = urllib.parse.urlparse(self.path)
+    query = urllib.parse.parse_qs(url.query)
+    parts = [part for part in url.path.split('/') if part]
+    base = f'http://{self.headers.get("Host")}'
+
+    if method == 'GET' and len(parts) == 1 and parts[0] in ('users', 'groups'):
+      return self.fixtures.page(parts[0], int(query.get('current', ['1'])[0]))
+    if method == 'GET' and len(parts) == 2 and parts[0] == 'public':
+      uuids = query.get('uuids', [''])[0].split(',')
+      return self.fixtures.profile_list([uuid for uuid in uuids if uuid])
+    if method == 'GET' and len(parts) == 2 and parts[0] in ('users', 'groups'):
+      return self.fixtures.stats(parts[0], parts[1])
+    if method == 'POST' and parts == ['games']:
+      return self.fixtures.game(base)
+    if method == 'PATCH' and len(parts) == 3 and parts[0] == 'games' and parts[2] == 'answer':
+      return self.fixtures.game(base, answer=True, game_id=parts[1])
+
+    return None
+
+  def handle_method(self, method):
+    self.read_body()
+    data = self.route(method)
+
+    if data is None:
+      self.send_json({'errors': [{'status': '404', 'title': 'Not Found'}]}, status=404)
+    else:
+      self.send_json(data)
+
+  def do_GET(self):
+    self.handle_method('GET')
+
+  def do_POST(self):
+    self.handle_method('POST')
+
+  def do_PATCH(self):
+    self.handle_method('PATCH')
+
+def make_server(port=DEFAULT_PORT, pages=DEFAULT_PAGES, latency=0, host='127.0.0.1'):
+  '''
+  Returns a ready (not yet serving) mock server, port 0 picks a free port
+  '''
+  handler = type('Handler', (MockHandler,), {'fixtures': Fixtures(pages), 'latency': latency})
+  server = ThreadingHTTPServer((host, port), handler)
+  server.daemon_threads = True
+  return server
+
+def run(port=DEFAULT_PORT, pages=DEFAULT_PAGES, latency=0):
+  httpd = make_server(port, pages, latency)
+  print(f'Starting mock Freerice server on port {httpd.server_address[1]} ({pages} pages per leaderboard)...')
+  httpd.serve_forever()
+
+if __name__ == '__main__':
+  # Usage: python3 MockServer.py [port] [pages] [latency in ms]
+  args = sys.argv[1:] + [None] * 3
+  run(
+    int(args[0] or DEFAULT_PORT),
+    int(args[1] or DEFAULT_PAGES),
+    float(args[2] or 0) / 1000
+  )
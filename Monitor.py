@@ -0,0 +1,82 @@
+from Freerice import Freerice
+import time
+
+'''
+  Change-only polling of a user's (or group's) rice and rank.
+
+  Each poll is a conditional request (Freerice.pollUserStats), so an
+  unchanged user costs a 304 when the server supports ETag or
+  Last-Modified. While the values stay the same the interval grows by
+  'backoff' up to 'max_interval', and it drops back to 'interval' as
+  soon as they change.
+'''
+
+MIN_INTERVAL = 1  # seconds between polls while the values change
+MAX_INTERVAL = 60 # longest wait while they stay the same
+BACKOFF      = 1.5
+
+class Monitor:
+  def __init__(self, user, group=False, interval=MIN_INTERVAL, max_interval=MAX_INTERVAL, backoff=BACKOFF, session=None):
+    '''
+    Polls the stats of user, see changes()
+    '''
+
+    self.user    = user
+    self.group   = group
+    self.session = session
+
+    self.interval     = interval
+    self.max_interval = max(interval, max_interval)
+    self.backoff      = backoff
+    self.wait         = interval # current wait between polls
+
+    self.etag     = None
+    self.modified = None
+    self.last     = None # last StatsData seen
+
+    self.n_polls   = 0
+    self.n_changes = 0
+
+  def poll(self):
+    '''
+    Polls once, returns the new StatsData if rice or rank changed, otherwise None
+    '''
+
+    self.n_polls += 1
+
+    data, self.etag, self.modified = Freerice.pollUserStats(
+      self.user,
+      group=self.group,
+      etag=self.etag,
+      modified=self.modified,
+      session=self.session
+    )
+
+    if data is None or data.error:
+      return None
+
+    if self.last is not None and (data.rice_total, data.rank) == (self.last.rice_total, self.last.rank):
+      return None
+
+    self.last       = data
+    self.n_changes += 1
+
+    return data
+
+  def changes(self):
+    '''
+    Yields a StatsData every time rice or rank changes (the first poll always does),
+    sleeping between polls
+    '''
+
+    while True:
+      data = self.poll()
+
+      if data is None:
+        self.wait = min(self.wait * self.backoff, self.max_interval)
+      else:
+        self.wait = self.interval
+
+        yield data
+
+      time.sleep(self.wait)
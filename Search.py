@@ -0,0 +1,71 @@
+'''
+  Offline substring search over leaderboard entries.
+
+  The index maps every lowercase trigram of a profile name to the
+  entries containing it. A query only checks the entries that contain
+  all of its trigrams, instead of scanning every name.
+'''
+
+MIN_QUERY = 3 # shortest query the index can answer (one trigram)
+
+def trigrams(text):
+  return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class SearchIndex:
+  def __init__(self, entries=()):
+    '''
+    Trigram index over (user, page, total_pages, profile) entries,
+    as yielded by Freerice.getAllUsers or SnapshotStore.iterUsers
+    '''
+
+    self.entries = []    # (user, page, profile, lowercase name)
+    self.uuids   = set() # indexed UUIDs, each user is only indexed once
+    self.grams   = {}    # trigram -> set of entry positions
+
+    self.update(entries)
+
+  def __len__(self):
+    return len(self.entries)
+
+  def add(self, user, page, profile):
+    '''
+    Indexes one entry, returns False if its UUID was already indexed
+    '''
+
+    if user['id'] in self.uuids:
+      return False
+
+    name = (profile.get('name') or '').lower() if profile else ''
+    pos  = len(self.entries)
+
+    self.uuids.add(user['id'])
+    self.entries.append((user, page, profile, name))
+
+    for gram in trigrams(name):
+      self.grams.setdefault(gram, set()).add(pos)
+
+    return True
+
+  def update(self, entries):
+    for user, page, total_pages, profile in entries:
+      self.add(user, page, profile)
+
+  def search(self, term):
+    '''
+    Returns [(user, page, profile)] whose name contains term, in index (rank) order
+    '''
+
+    term = term.lower()
+
+    if len(term) < MIN_QUERY:
+      raise ValueError('Search term must be at least %s characters.' % MIN_QUERY)
+
+    # Start from the rarest trigram so the intersection stays small
+    postings = sorted((self.grams.get(gram, set()) for gram in trigrams(term)), key=len)
+    found    = set(postings[0]).intersection(*postings[1:])
+
+    return [
+      self.entries[pos][:3]
+      for pos in sorted(found)
+      if term in self.entries[pos][3]
+    ]
@@ -0,0 +1,222 @@
+import sqlite3
+import json
+import time
+
+'''
+  Local snapshot store for the Freerice leaderboards.
+
+  Every leaderboard page fetched by Freerice.getAllUsers is kept together
+  with its fetch timestamp, and every profile ('name' and 'avatar') is kept
+  by UUID. Later walks serve pages from here while they are fresh instead
+  of re-downloading them.
+
+  Table    | Key          | Columns
+------------------------------------------------------------------
+  pages    | kind, page   | total_pages, fetched, users (JSON list)
+  profiles | kind, uuid   | name, avatar, fetched
+
+  'kind' is either 'users' or 'groups'.
+'''
+
+DEFAULT_PATH    = 'freerice_cache.sqlite3'
+DEFAULT_MAX_AGE = 15 * 60 # seconds a page stays fresh
+
+def pageKey(users):
+  '''
+  What a leaderboard page is compared by: its users, ranks and rice
+  '''
+
+  return [(user['id'], user['attributes']['rank'], user['attributes']['rice']) for user in users]
+
+class SnapshotStore:
+  def __init__(self, path=DEFAULT_PATH, max_age=DEFAULT_MAX_AGE):
+    '''
+    SQLite backed store of leaderboard pages and profiles
+    '''
+
+    self.path    = path
+    self.max_age = max_age
+
+    self.db = sqlite3.connect(path)
+    self.db.executescript('''
+      CREATE TABLE IF NOT EXISTS pages (
+        kind        TEXT    NOT NULL,
+        page        INTEGER NOT NULL,
+        total_pages INTEGER NOT NULL,
+        fetched     REAL    NOT NULL,
+        users       TEXT    NOT NULL,
+        PRIMARY KEY (kind, page)
+      );
+      CREATE TABLE IF NOT EXISTS profiles (
+        kind    TEXT NOT NULL,
+        uuid    TEXT NOT NULL,
+        name    TEXT NOT NULL,
+        avatar  TEXT,
+        fetched REAL NOT NULL,
+        PRIMARY KEY (kind, uuid)
+      );
+    ''')
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
+
+  @staticmethod
+  def kind(groups):
+    return 'groups' if groups else 'users'
+
+  def isFresh(self, fetched):
+    return self.max_age is None or time.time() - fetched <= self.max_age
+
+  def getPage(self, groups, page, fresh_only=True):
+    '''
+    Returns (users, total_pages, fetched) for a stored page,
+    or None if it is missing (or stale, when fresh_only is set)
+    '''
+
+    row = self.db.execute(
+      'SELECT users, total_pages, fetched FROM pages WHERE kind = ? AND page = ?',
+      (self.kind(groups), page)
+    ).fetchone()
+
+    if row is None:
+      return None
+
+    users, total_pages, fetched = row
+
+    if fresh_only and not self.isFresh(fetched):
+      return None
+
+    return json.loads(users), total_pages, fetched
+
+  def putPage(self, groups, page, total_pages, users):
+    with self.db:
+      self.db.execute(
+        'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)',
+        (self.kind(groups), page, total_pages, time.time(), json.dumps(users, separators=(',', ':')))
+      )
+
+  def syncPage(self, groups, page, total_pages, users):
+    '''
+    Stores a freshly fetched page, returns True if it differs
+    from the stored snapshot (or there was none)
+    '''
+
+    old = self.getPage(groups, page, fresh_only=False)
+
+    self.putPage(groups, page, total_pages, users)
+
+    return old is None or pageKey(old[0]) != pageKey(users)
+
+  def prunePages(self, groups, total_pages):
+    '''
+    Deletes the stored pages after total_pages, returns how many there were
+    '''
+
+    with self.db:
+      return self.db.execute(
+        'DELETE FROM pages WHERE kind = ? AND page > ?',
+        (self.kind(groups), total_pages)
+      ).rowcount
+
+  def getProfiles(self, groups, uuids):
+    '''
+    Returns {uuid: {'uuid', 'name', 'avatar'}} for the stored profiles
+    among uuids. Missing UUIDs are simply left out.
+    '''
+
+    profiles = {}
+    uuids    = list(uuids)
+    kind     = self.kind(groups)
+
+    # SQLite limits the number of bound parameters, so look them up in chunks
+    for i in range(0, len(uuids), 500):
+      chunk = uuids[i:i + 500]
+      rows  = self.db.execute(
+        'SELECT uuid, name, avatar FROM profiles WHERE kind = ? AND uuid IN (%s)' % ','.join('?' * len(chunk)),
+        [kind] + chunk
+      )
+
+      for uuid, name, avatar in rows:
+        profiles[uuid] = {
+          'uuid'  : uuid,
+          'name'  : name,
+          'avatar': avatar
+        }
+
+    return profiles
+
+  def putProfiles(self, groups, profiles):
+    '''
+    Stores a {uuid: {'name', 'avatar', ...}} response from the profile endpoints
+    '''
+
+    now  = time.time()
+    kind = self.kind(groups)
+
+    with self.db:
+      self.db.executemany(
+        'INSERT OR REPLACE INTO profiles VALUES (?, ?, ?, ?, ?)',
+        (
+          (kind, uuid, profile['name'], profile.get('avatar'), now)
+          for uuid, profile in profiles.items()
+        )
+      )
+
+  def iterUsers(self, groups, fresh_only=False):
+    '''
+    Yields (user, page, total_pages, profile) for every stored page in
+    rank order, like Freerice.getAllUsers does, without any network access.
+    Users without a stored profile get an empty profile.
+    '''
+
+    rows = self.db.execute(
+      'SELECT page, total_pages, fetched, users FROM pages WHERE kind = ? ORDER BY page',
+      (self.kind(groups),)
+    ).fetchall()
+
+    for page, total_pages, fetched, users in rows:
+      if fresh_only and not self.isFresh(fetched):
+        continue
+
+      users    = json.loads(users)
+      profiles = self.getProfiles(groups, [user['id'] for user in users])
+
+      for user in users:
+        yield user, page, total_pages, profiles.get(user['id'], {})
+
+  def coverage(self, groups):
+    '''
+    Describes what is stored of a leaderboard: pages stored, how many of
+    them are fresh, total_pages (as of the newest page) and the age of the
+    newest page in seconds. None if nothing is stored.
+    '''
+
+    rows = self.db.execute(
+      'SELECT total_pages, fetched FROM pages WHERE kind = ? ORDER BY fetched DESC',
+      (self.kind(groups),)
+    ).fetchall()
+
+    if not rows:
+      return None
+
+    return {
+      'pages'      : len(rows),
+      'fresh'      : sum(1 for _, fetched in rows if self.isFresh(fetched)),
+      'total_pages': rows[0][0],
+      'age'        : time.time() - rows[0][1]
+    }
+
+  def clear(self, groups=None):
+    with self.db:
+      if groups is None:
+        self.db.execute('DELETE FROM pages')
+        self.db.execute('DELETE FROM profiles')
+      else:
+        self.db.execute('DELETE FROM pages WHERE kind = ?', (self.kind(groups),))
+        self.db.execute('DELETE FROM profiles WHERE kind = ?', (self.kind(groups),))
+
+  def close(self):
+    self.db.close()
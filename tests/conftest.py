@@ -0,0 +1,68 @@
+import threading
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def mock_server():
+  '''
+  A MockServer.py on a free port, with Freerice pointed at it
+  '''
+
+  pytest.importorskip('requests')
+
+  from MockServer import make_server
+  from Freerice import Freerice
+
+  server = make_server(port=0, pages=3)
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+
+  base  = f'http://127.0.0.1:{server.server_address[1]}'
+  hosts = (Freerice.engine_host, Freerice.accounts_host)
+
+  Freerice.setHosts(base, base)
+  Freerice.clearCache()
+
+  yield server
+
+  Freerice.setHosts(*hosts)
+  server.shutdown()
+
+
+class SuffixedSession:
+  '''
+  A requests session serving one leaderboard page of users 'a' and 'b', whose
+  profiles response has the query string appended to the last UUID, like the
+  real profile endpoints sometimes do
+  '''
+
+  def __init__(self):
+    self.profile_requests = 0
+
+  def request(self, method, url, **kwargs):
+    from types import SimpleNamespace
+    import json
+
+    if '/public/' in url:
+      self.profile_requests += 1
+
+      uuids, suffix = url.split('uuids=')[1].split('&', 1)
+      uuids         = uuids.split(',')
+      data          = {uuid: {'uuid': uuid, 'name': 'Name ' + uuid, 'avatar': 'avatar-1'} for uuid in uuids}
+      data[uuids[-1] + '&' + suffix] = data.pop(uuids[-1])
+    else:
+      users = [{'id': uuid, 'attributes': {'rank': rank, 'rice': 10 - rank}} for rank, uuid in enumerate('ab', 1)]
+      data  = {'data': users, 'meta': {'pagination': {'total_pages': 1}}}
+
+    return SimpleNamespace(content=json.dumps(data).encode(), status_code=200)
+
+
+@pytest.fixture
+def suffixed_session():
+  pytest.importorskip('requests')
+
+  return SuffixedSession()
@@ -0,0 +1,90 @@
+import asyncio
+import types
+import json
+import sys
+
+import pytest
+
+pytest.importorskip('requests')
+
+from AsyncFreerice import iterAllUsers
+
+
+def page(n, total_pages=3):
+  users = [{'id': f'u{n}-{i}', 'attributes': {'rank': n * 10 + i, 'rice': 100 - i}} for i in range(2)]
+
+  return json.dumps({'data': users, 'meta': {'pagination': {'total_pages': total_pages}}}).encode()
+
+
+class Response:
+  interrupted = False
+
+  def __init__(self, url):
+    self.url    = url
+    self.status = 200
+
+  async def __aenter__(self):
+    return self
+
+  async def __aexit__(self, *exc):
+    pass
+
+  async def read(self):
+    if 'current=1&' not in self.url:
+      # Ctrl-C lands in the event loop (once) while the walk waits for page 2
+      if not Response.interrupted:
+        Response.interrupted = True
+
+        asyncio.get_running_loop().call_later(0.01, self.interrupt)
+
+      await asyncio.sleep(60)
+
+    return page(1)
+
+  @staticmethod
+  def interrupt():
+    raise KeyboardInterrupt
+
+
+class Session:
+  sessions = []
+
+  def __init__(self, **kwargs):
+    self.closed = False
+
+    Session.sessions.append(self)
+
+  def request(self, method, url, **kwargs):
+    return Response(url)
+
+  async def close(self):
+    self.closed = True
+
+
+@pytest.fixture
+def aiohttp(monkeypatch):
+  '''
+  Just enough of aiohttp for AsyncFreerice to open (and close) its own session
+  '''
+
+  module = types.SimpleNamespace(ClientSession=Session, TCPConnector=dict, ClientTimeout=dict)
+  monkeypatch.setitem(sys.modules, 'aiohttp', module)
+
+  Session.sessions.clear()
+
+  Response.interrupted = False
+
+  return module
+
+
+def test_interrupted_walk_closes_the_session(aiohttp):
+  rows = iterAllUsers(concurrency=2, rate=0)
+
+  assert next(rows)[1] == 1
+
+  with pytest.raises(KeyboardInterrupt):
+    for _ in rows:
+      pass
+
+  assert len(Session.sessions) == 1
+  assert Session.sessions[0].closed
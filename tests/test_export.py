@@ -0,0 +1,33 @@
+import csv
+import os
+
+import pytest
+
+pytest.importorskip('requests')
+
+from Export import exportLeaderboard
+
+
+def ranks(path):
+  with open(path, newline='', encoding='utf-8') as f:
+    return [int(row['rank']) for row in csv.DictReader(f)]
+
+
+def test_stopped_export_resumes(mock_server, tmp_path):
+  path = str(tmp_path / 'users.csv')
+  g    = exportLeaderboard(path)
+
+  assert [next(g), next(g)] == [(1, 3), (2, 3)]
+
+  g.close()
+
+  assert os.path.exists(path + '.progress')
+
+  # Half a row written after the last saved page is dropped on resume
+  with open(path, 'a', encoding='utf-8') as f:
+    f.write('9999,1,half-a-row')
+
+  assert list(exportLeaderboard(path)) == [(3, 3)]
+
+  assert ranks(path) == list(range(1, 151))
+  assert not os.path.exists(path + '.progress')
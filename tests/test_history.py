@@ -0,0 +1,55 @@
+import pytest
+
+from History import History, formatGrowth, parseWindow
+
+
+def test_parse_window():
+  assert parseWindow('90') == 90
+  assert parseWindow('30m') == 30 * 60
+  assert parseWindow('2h') == 2 * 60 * 60
+
+  with pytest.raises(ValueError):
+    parseWindow('xyz')
+
+
+def test_growth_with_lost_rice(tmp_path):
+  with History(str(tmp_path / 'history.sqlite3')) as hist:
+    hist.append('u', 1000, 5, ts=1000)
+    hist.append('u', 900, 7, ts=1000 + 60 * 60)
+
+    stats = hist.growth('u', window=2 * 60 * 60, until=1000 + 60 * 60)
+
+  assert stats['rice_gained'] == -100
+
+  text = formatGrowth('u', stats)
+
+  assert '(-100, -100.0 per hour)' in text
+  assert '+-' not in text
+
+
+def test_growth_with_gained_rice(tmp_path):
+  with History(str(tmp_path / 'history.sqlite3')) as hist:
+    hist.append('u', 1000, 5, ts=1000)
+    hist.append('u', 1500, 4, ts=1000 + 60 * 60)
+
+    stats = hist.growth('u', window=2 * 60 * 60, until=1000 + 60 * 60)
+
+  assert '(+500, +500.0 per hour)' in formatGrowth('u', stats)
+
+
+def test_short_sessions_are_rolled_up(tmp_path):
+  path = str(tmp_path / 'history.sqlite3')
+
+  for session in range(3):
+    with History(path) as hist:
+      for i in range(5):
+        hist.append('u', 1000 + session * 10 + i, 5, ts=1000 + session * 60 + i)
+
+  with History(path) as hist:
+    assert hist.db.execute('SELECT COUNT(*) FROM samples').fetchone()[0] == 0
+    assert hist.db.execute('SELECT SUM(n) FROM hours').fetchone()[0] == 15
+
+    stats = hist.growth('u', window=60 * 60, until=2000)
+
+  assert stats['samples'] == 15
+  assert stats['rice_last'] == 1024
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from MockServer import load_fixture
+import Parser
+
+
+def dumps(data):
+  return json.dumps(data).encode()
+
+
+def test_fixtures_parse():
+  game = Parser.parseGame(dumps(load_fixture('game_new')))
+
+  assert not game.error
+  assert game.question_txt
+
+  assert not Parser.parseAnswer(dumps(load_fixture('game_answer'))).error
+  assert not Parser.parseStats(dumps(load_fixture('stats_group')), True).error
+
+
+@pytest.mark.parametrize('data', [
+  None,
+  [],
+  {'data': None},
+  {'data': []},
+  {'data': {'id': 'x', 'attributes': None}},
+  {'data': {'id': 'x', 'attributes': []}}
+])
+def test_game_and_stats_without_attributes(data):
+  for ret in (Parser.parseGame(dumps(data)), Parser.parseStats(dumps(data), True)):
+    assert ret.error
+    assert ret.error_id == Parser.MISSING_ERROR
+
+
+@pytest.mark.parametrize('field', ['question', 'links', 'userattributes'])
+@pytest.mark.parametrize('value', [None, [], 'text'])
+def test_game_with_odd_nested_fields(field, value):
+  game = load_fixture('game_new')
+  if field == 'links':
+    game['data']['links'] = value
+  else:
+    game['data']['attributes'][field] = value
+
+  ret = Parser.parseGame(dumps(game))
+
+  assert not ret.error
+  assert ret.error_id in (0, Parser.RICE_ERROR)
+
+
+@pytest.mark.parametrize('fields', [None, [], 'name'])
+def test_profiles_that_are_not_objects(fields):
+  ret = Parser.parseProfiles(dumps({'a': fields, 'b': {'name': 'B', 'avatar': 'x'}}), ['a', 'b'])
+
+  assert ret['a'].error
+  assert ret['a'].error_id == Parser.MISSING_ERROR
+  assert not ret['b'].error
+  assert ret['b'].name == 'B'
+
+
+def test_not_json():
+  assert Parser.parseGame(b'<html>').error_id == Parser.JSON_ERROR
+
+
+def test_profile_page_maps_the_suffixed_uuid_back():
+  raw = dumps({
+    'a': {'uuid': 'a', 'name': 'A', 'avatar': 'avatar-1'},
+    'b&_format=json': {'uuid': 'b', 'name': 'B', 'avatar': 'avatar-2'}
+  })
+
+  profiles = Parser.parseProfilePage(raw, ['a', 'b', 'c'], '&_format=json')
+
+  assert profiles == {
+    'a': {'uuid': 'a', 'name': 'A', 'avatar': 'avatar-1'},
+    'b': {'uuid': 'b', 'name': 'B', 'avatar': 'avatar-2'}
+  }
+
+  with pytest.raises(ValueError):
+    Parser.parseProfilePage(dumps([]), ['a'])
+
+
+def test_get_all_users_with_a_suffixed_profile(suffixed_session):
+  from Freerice import Freerice
+
+  rows = list(Freerice.getAllUsers(get_profiles=True, session=suffixed_session))
+
+  assert [profile['name'] for _, _, _, profile in rows] == ['Name a', 'Name b']
@@ -0,0 +1,72 @@
+from itertools import islice
+import json
+
+import pytest
+
+from Parser import parseGame
+from MockServer import load_fixture
+
+
+def game(text, options):
+  data = load_fixture('game_new')
+  data['data']['attributes']['question'] = {'text': text, 'options': options}
+
+  return parseGame(json.dumps(data))
+
+
+def test_answer_id_picks_the_product():
+  pytest.importorskip('requests')
+
+  from Freerice import answerId
+
+  options = [{'id': 'a54', 'text': '54'}, {'id': 'a56', 'text': '56'}]
+
+  assert answerId(game('7 x 8', options)) == 'a56'
+  assert answerId(game('7 x 9', options)) is None
+  assert answerId(game('seven x 8', options)) is None
+  assert answerId(game('', options)) is None
+
+
+def test_play_answers_every_round(mock_server):
+  from Freerice import Freerice, formatRound
+
+  rounds = list(islice(Freerice('user').play(), 3))
+
+  assert len(rounds) == 3
+
+  for game_, answer_id, result, seconds in rounds:
+    assert answer_id == 'a56'
+    assert not result.error
+    assert formatRound(game_, answer_id, result, seconds).startswith("Answered '7 x 8'.")
+
+
+def test_play_stops_at_a_failed_round(mock_server, monkeypatch):
+  from Freerice import Freerice, formatRound
+
+  monkeypatch.setattr('Freerice.answerId', lambda game: None)
+
+  rounds = list(islice(Freerice('user').play(), 3))
+
+  assert len(rounds) == 1
+  assert rounds[0][2] is None
+  assert formatRound(*rounds[0]) == 'Failed to find the answer to: 7 x 8'
+
+
+def test_play_gives_up_after_the_retries(monkeypatch):
+  pytest.importorskip('requests')
+
+  from Freerice import Freerice
+
+  calls = []
+
+  def newGame(self):
+    calls.append(1)
+
+    raise ConnectionError('down')
+
+  monkeypatch.setattr(Freerice, 'newGame', newGame)
+
+  with pytest.raises(ConnectionError):
+    list(Freerice('user').play(retries=2, retry_delay=0))
+
+  assert len(calls) == 3
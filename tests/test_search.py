@@ -0,0 +1,34 @@
+import pytest
+
+from Search import SearchIndex, MIN_QUERY
+
+
+def entry(uuid, name, page=1):
+  return {'id': uuid, 'attributes': {'rank': 1, 'rice': 0}}, page, 1, {'uuid': uuid, 'name': name}
+
+
+def test_each_uuid_is_indexed_once():
+  index = SearchIndex([entry('a', 'Grain Of Truth'), entry('a', 'Grain Of Truth', page=2), entry('b', 'Grainy')])
+
+  assert len(index) == 2
+  assert [user['id'] for user, _, _ in index.search('grain')] == ['a', 'b']
+
+  user, page, _, profile = entry('b', 'Grainy')
+
+  assert not index.add(user, page, profile)
+
+
+def test_short_queries_are_rejected():
+  index = SearchIndex([entry('a', 'ab')])
+
+  with pytest.raises(ValueError):
+    index.search('a' * (MIN_QUERY - 1))
+
+
+def test_queries_match_across_trigrams():
+  index = SearchIndex([entry('a', 'abcxbcd'), entry('b', 'xxABCDxx'), entry('c', 'no profile name'), entry('d', '')])
+
+  # 'abcxbcd' has both of 'abcd''s trigrams, but not 'abcd' itself
+  assert [user['id'] for user, _, _ in index.search('abcd')] == ['b']
+  assert [user['id'] for user, _, _ in index.search('e nam')] == ['c']
+  assert index.search('zzz') == []
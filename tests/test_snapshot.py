@@ -0,0 +1,41 @@
+from Snapshot import SnapshotStore
+
+
+def test_sync_drops_pages_past_a_shrunk_leaderboard(mock_server, tmp_path):
+  from Freerice import Freerice
+
+  with SnapshotStore(str(tmp_path / 'cache.sqlite3')) as store:
+    list(Freerice.syncAllUsers(store, get_profiles=False))
+
+    assert store.coverage(False)['pages'] == 3
+
+    mock_server.RequestHandlerClass.fixtures.pages = 2
+
+    list(Freerice.syncAllUsers(store, get_profiles=False))
+
+    assert store.getPage(False, 3, fresh_only=False) is None
+    assert store.coverage(False)['pages'] == 2
+    assert {page for _, page, _, _ in store.iterUsers(False)} == {1, 2}
+
+
+def test_prune_pages_keeps_the_other_leaderboard(tmp_path):
+  with SnapshotStore(str(tmp_path / 'cache.sqlite3')) as store:
+    for groups in (False, True):
+      for page in (1, 2, 3):
+        store.putPage(groups, page, 3, [])
+
+    assert store.prunePages(False, 1) == 2
+    assert store.coverage(False)['pages'] == 1
+    assert store.coverage(True)['pages'] == 3
+
+
+def test_second_sync_fetches_no_profiles(suffixed_session):
+  from Freerice import Freerice
+
+  with SnapshotStore(':memory:') as store:
+    first  = sum(n for _, _, _, n in Freerice.syncAllUsers(store, session=suffixed_session))
+    second = sum(n for _, _, _, n in Freerice.syncAllUsers(store, session=suffixed_session))
+
+    assert (first, second) == (2, 0)
+    assert suffixed_session.profile_requests == 1
+    assert set(store.getProfiles(False, ['a', 'b'])) == {'a', 'b'}